@@ -1,18 +1,50 @@
 from __future__ import annotations
 
 import logging
+import os
+import time
+from contextlib import aclosing
+
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.exceptions import ConfigEntryNotReady, ServiceValidationError
 from homeassistant.helpers import config_entry_oauth2_flow
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import issue_registry as ir
 
-from .const import DOMAIN, PLATFORMS, CONF_LISTONIC_REFRESH_TOKEN
+from .const import (
+    DOMAIN,
+    PLATFORMS,
+    CONF_DEDUP_ON_ADD,
+    CONF_CPU_BUDGET_MS,
+    CONF_LAG_BUDGET_MS,
+    CONF_REPLAY_CASSETTE,
+    CONF_REPLAY_SPEED,
+)
+from .coordinator import ListonicCoordinator
+from .credentials import ListonicCredentialStore
+from .history import ListonicHistory
+from .item_index import ListonicItemIndex, async_add_item
 from .listonic_api import ListonicClient
 from .oauth2 import get_oauth_implementation
+from .profiler import (
+    DEFAULT_CPU_BUDGET_MS,
+    DEFAULT_LAG_BUDGET_MS,
+    ListonicProfiler,
+    async_run_profile,
+)
+from .transfer import async_export_lists, async_import_list, transfer_path
+from .transport import REPLAY_ACCESS_TOKEN, ReplayTransport, load_cassette
 # from .list_management import async_setup_list_management
 
 _LOGGER = logging.getLogger(__name__)
 
+GET_ALL_ITEMS_SCHEMA = vol.Schema({
+    vol.Optional("limit", default=100): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+    vol.Optional("cursor"): vol.Any(None, cv.string),
+})
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Listonic from a config entry."""
@@ -22,16 +54,58 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     try:
         implementation = get_oauth_implementation(hass, entry)
         session = config_entry_oauth2_flow.OAuth2Session(hass, entry, implementation)
-        client = ListonicClient(hass, session, entry)
-        
-        # If we have a stored refresh token, set it in the client
-        if CONF_LISTONIC_REFRESH_TOKEN in entry.data:
-            client._listonic_refresh_token = entry.data[CONF_LISTONIC_REFRESH_TOKEN]
+
+        # Replaying a recorded cassette lets poll cycles be profiled without the Listonic API
+        transport = None
+        if cassette := entry.options.get(CONF_REPLAY_CASSETTE):
+            records = await hass.async_add_executor_job(load_cassette, transfer_path(hass, cassette))
+            transport = ReplayTransport(records, speed=entry.options.get(CONF_REPLAY_SPEED, 1.0))
+            _LOGGER.warning("Listonic is replaying %s recorded requests from %s", len(records), cassette)
+            # A throwaway token that is never saved, so replay can't overwrite the real ones
+            credentials = ListonicCredentialStore(hass, entry.entry_id, persist=False)
+            credentials.update(REPLAY_ACCESS_TOKEN)
+        else:
+            # Tokens live in their own store, so rotating them doesn't rewrite the config entry
+            credentials = ListonicCredentialStore(hass, entry.entry_id)
+            await credentials.async_load(entry)
+
+        client = ListonicClient(hass, session, entry, credentials, transport)
             
     except Exception as err:
         raise ConfigEntryNotReady(f"Listonic client not ready: {err}") from err
 
-    hass.data[DOMAIN][entry.entry_id] = {"client": client}
+    # --- Step 2: local history and the coordinator that feeds it ---
+    index = ListonicItemIndex()
+    # Replayed cassettes wrap around and replay their diffs again, which must not
+    # end up as purchases in the real account's history
+    history = ListonicHistory(hass, entry.entry_id, persist=not client.replay)
+    await history.async_load()
+
+    profiler = ListonicProfiler(
+        hass,
+        entry.entry_id,
+        cpu_budget_ms=entry.options.get(CONF_CPU_BUDGET_MS, DEFAULT_CPU_BUDGET_MS),
+        lag_budget_ms=entry.options.get(CONF_LAG_BUDGET_MS, DEFAULT_LAG_BUDGET_MS),
+    )
+    client.profiler = profiler
+
+    coordinator = ListonicCoordinator(hass, entry, client, index, history, profiler)
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        # Setup is retried later with a new client, don't leave this one's session open
+        await client.async_close()
+        raise
+    profiler.async_start()
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        "client": client,
+        "index": index,
+        "history": history,
+        "profiler": profiler,
+        "coordinator": coordinator,
+        "options": dict(entry.options),  # as used for this setup
+    }
     
     # --- Register services ---
     async def _svc_get_lists(call: ServiceCall) -> dict:
@@ -46,7 +120,26 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     async def _svc_add_item(call: ServiceCall) -> None:
         list_id = call.data["list_id"]
         name = call.data["name"]
-        await client.add_item(list_id, name)
+        dedup = call.data.get("dedup", entry.options.get(CONF_DEDUP_ON_ADD, False))
+        await async_add_item(client, index, list_id, name, dedup)
+
+    async def _svc_find_item(call: ServiceCall) -> dict:
+        """Look up items by name across all lists using the in-memory index."""
+        name = call.data["name"]
+        limit = call.data.get("limit")
+        matches = index.find(
+            name,
+            list_id=call.data.get("list_id"),
+            prefix=call.data.get("prefix", False),
+            include_checked=call.data.get("include_checked", True),
+            limit=int(limit) if limit else None,
+        )
+        items = []
+        for item in matches:
+            result = item.as_dict()
+            result["list_name"] = index.list_name(item.list_id)
+            items.append(result)
+        return {"items": items}
 
     async def _svc_get_items(call: ServiceCall) -> dict:
         list_id = call.data.get("list_id")
@@ -57,6 +150,104 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.bus.async_fire("listonic_items", {"list_id": list_id, "items": items})
         return {"items": items}
 
+    async def _svc_get_all_items(call: ServiceCall) -> dict:
+        """Page through the items of every list, fetched lazily from Listonic."""
+        limit = call.data["limit"]
+        cursor = call.data.get("cursor")
+        lists = await client.get_lists()
+        start, offset = 0, 0
+        if cursor:
+            try:
+                cursor_list, cursor_offset = cursor.rsplit(":", 1)
+                offset = int(cursor_offset)
+                start = next(i for i, lst in enumerate(lists) if str(lst["Id"]) == cursor_list)
+            except (ValueError, StopIteration) as err:
+                raise ServiceValidationError(f"Invalid or expired cursor: {cursor}") from err
+
+        page = []
+        next_cursor = None
+        first_id = lists[start]["Id"] if lists else None
+        current_id, position = None, 0  # items seen so far in the current list
+        # aclosing() cancels the prefetches as soon as the page is full
+        async with aclosing(client.iter_items(lists[start:])) as items:
+            async for lst, item in items:
+                if lst["Id"] != current_id:
+                    current_id, position = lst["Id"], 0
+                position += 1
+                if current_id == first_id and position <= offset:
+                    continue
+                if len(page) >= limit:
+                    next_cursor = f"{current_id}:{position - 1}"
+                    break
+                page.append({
+                    "list_id": current_id,
+                    "list_name": lst.get("Name"),
+                    "id": item["Id"],
+                    "name": item.get("Name"),
+                    "checked": bool(item.get("Checked")),
+                })
+        return {"items": page, "next_cursor": next_cursor}
+
+    async def _svc_suggest_items(call: ServiceCall) -> dict:
+        """Suggest items from the local purchase history."""
+        suggestions = history.suggest(
+            index if call.data.get("exclude_listed", True) else None,
+            limit=int(call.data.get("limit", 10)),
+            prefix=call.data.get("prefix"),
+        )
+        return {"items": suggestions}
+
+    async def _svc_export_lists(call: ServiceCall) -> dict:
+        """Export lists and items from the coordinator model to a file."""
+        return await async_export_lists(
+            hass,
+            coordinator.data,
+            call.data["file"],
+            fmt=call.data.get("format"),
+            list_ids=call.data.get("list_ids"),
+        )
+
+    async def _svc_import_list(call: ServiceCall) -> dict:
+        """Import items from an exported file into a list."""
+        result = await async_import_list(
+            hass,
+            client,
+            call.data["file"],
+            call.data["list_id"],
+            fmt=call.data.get("format"),
+            source_list=call.data.get("source_list"),
+            include_checked=call.data.get("include_checked", True),
+            resume=call.data.get("resume", True),
+        )
+        await coordinator.async_request_refresh()
+        return result
+
+    async def _svc_start_recording(call: ServiceCall) -> None:
+        """Record sanitised Listonic traffic to a cassette file."""
+        path = transfer_path(hass, call.data.get("file", "cassette.jsonl"))
+        await hass.async_add_executor_job(os.makedirs, os.path.dirname(path), 0o755, True)
+        try:
+            client.start_recording(path)
+        except RuntimeError as err:
+            raise ServiceValidationError(str(err)) from err
+        _LOGGER.info("Recording Listonic traffic to %s", path)
+
+    async def _svc_stop_recording(call: ServiceCall) -> dict:
+        try:
+            return await client.stop_recording()
+        except RuntimeError as err:
+            raise ServiceValidationError(str(err)) from err
+
+    async def _svc_profile(call: ServiceCall) -> dict:
+        """Run cProfile on the event loop for a while and save the stats file."""
+        seconds = float(call.data.get("seconds", 30))
+        path = transfer_path(hass, f"profile_{int(time.time())}.cprof")
+        try:
+            await async_run_profile(hass, path, seconds)
+        except RuntimeError as err:
+            raise ServiceValidationError(str(err)) from err
+        return {"path": path, **profiler.as_dict()}
+
     async def _svc_delete_items(call: ServiceCall) -> None:
         list_id = call.data.get("list_id")
         ids = call.data.get("ids", [])
@@ -122,6 +313,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.services.async_register(DOMAIN, "get_lists", _svc_get_lists, supports_response=True)
     hass.services.async_register(DOMAIN, "add_item", _svc_add_item)
     hass.services.async_register(DOMAIN, "get_items", _svc_get_items, supports_response=True)
+    hass.services.async_register(
+        DOMAIN, "get_all_items", _svc_get_all_items, schema=GET_ALL_ITEMS_SCHEMA, supports_response=True
+    )
+    hass.services.async_register(DOMAIN, "find_item", _svc_find_item, supports_response=True)
+    hass.services.async_register(DOMAIN, "suggest_items", _svc_suggest_items, supports_response=True)
+    hass.services.async_register(DOMAIN, "export_lists", _svc_export_lists, supports_response=True)
+    hass.services.async_register(DOMAIN, "import_list", _svc_import_list, supports_response=True)
+    hass.services.async_register(DOMAIN, "start_recording", _svc_start_recording)
+    hass.services.async_register(DOMAIN, "stop_recording", _svc_stop_recording, supports_response=True)
+    hass.services.async_register(DOMAIN, "profile", _svc_profile, supports_response=True)
     hass.services.async_register(DOMAIN, "delete_items", _svc_delete_items)
     hass.services.async_register(DOMAIN, "refresh_data", _svc_refresh_data)  # New service
 
@@ -130,8 +331,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Forward platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Options are read at setup, so apply changes by reloading the entry
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+
     return True
 
+
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    # Also called when entry.data changes, e.g. when the Google token is refreshed
+    # in the middle of a login; only a change of options needs a reload
+    data = hass.data[DOMAIN].get(entry.entry_id)
+    if data is not None and data["options"] == dict(entry.options):
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a Listonic config entry."""
     # Remove the items coordinator if it exists
@@ -140,5 +353,19 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
-    return unload_ok
\ No newline at end of file
+        data = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if data and "profiler" in data:
+            data["profiler"].async_stop()
+        ir.async_delete_issue(hass, DOMAIN, f"degraded_{entry.entry_id}")
+        if data and "history" in data:
+            await data["history"].async_flush()
+        if data and "client" in data:
+            await data["client"].credentials.async_flush()
+            await data["client"].async_close()
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove local data kept for a Listonic config entry."""
+    await ListonicHistory(hass, entry.entry_id).async_remove()
+    await ListonicCredentialStore(hass, entry.entry_id).async_remove()
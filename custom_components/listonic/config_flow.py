@@ -1,13 +1,29 @@
 from __future__ import annotations
 
 import logging
+import os
 from typing import Any, Optional
 
+import voluptuous as vol
+
 from homeassistant import config_entries
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_entry_oauth2_flow, selector
 from homeassistant.core import callback
-from .const import DOMAIN, CONF_LIST_IDS
+from .const import (
+    DOMAIN,
+    CONF_DEDUP_ON_ADD,
+    CONF_BANDWIDTH_SAVING,
+    CONF_AGGREGATE_TODO,
+    CONF_AGGREGATE_LIST_IDS,
+    CONF_CPU_BUDGET_MS,
+    CONF_LAG_BUDGET_MS,
+    CONF_REPLAY_CASSETTE,
+    CONF_REPLAY_SPEED,
+)
+from .profiler import DEFAULT_CPU_BUDGET_MS, DEFAULT_LAG_BUDGET_MS
+from .transfer import transfer_path
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -45,22 +61,12 @@ class ListonicConfigFlow(config_entry_oauth2_flow.AbstractOAuth2FlowHandler, dom
 
         return await self.async_step_pick_implementation()
 
-    # Add this method to the ListonicConfigFlow class
-    async def async_step_options(self, user_input=None):
-        """Manage the options."""
-        if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
-
-        # Get current lists from the API
-        # This would require accessing the client, which might be complex in the config flow
-        # For simplicity, we'll just show a form with manual list management
-        return self.async_show_form(
-            step_id="options",
-            data_schema=vol.Schema({
-                vol.Optional(CONF_LIST_IDS): selector.TextSelector(),
-            }),
-        )
-    
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> ListonicOptionsFlow:
+        """Return the options flow."""
+        return ListonicOptionsFlow()
+
     @callback
     def async_oauth_create_entry(self, data: dict) -> FlowResult:
         """Create config entry after OAuth2 flow finishes."""
@@ -72,4 +78,74 @@ class ListonicConfigFlow(config_entry_oauth2_flow.AbstractOAuth2FlowHandler, dom
     async def async_step_reauth_confirm(self, user_input: Optional[dict[str, Any]] = None) -> FlowResult:
         if user_input is None:
             return self.async_show_form(step_id="reauth_confirm")
-        return await self.async_step_user()
\ No newline at end of file
+        return await self.async_step_user()
+
+
+class ListonicOptionsFlow(config_entries.OptionsFlow):
+    """Change the optional features of a Listonic entry."""
+
+    async def async_step_init(self, user_input: Optional[dict[str, Any]] = None) -> FlowResult:
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            options = {**self.config_entry.options, **user_input}
+            cassette = user_input.get(CONF_REPLAY_CASSETTE, "").strip()
+            if not cassette:
+                options.pop(CONF_REPLAY_CASSETTE, None)
+            elif not await self._cassette_exists(cassette):
+                errors[CONF_REPLAY_CASSETTE] = "cassette_not_found"
+            else:
+                options[CONF_REPLAY_CASSETTE] = cassette
+            if not user_input.get(CONF_AGGREGATE_LIST_IDS):
+                options.pop(CONF_AGGREGATE_LIST_IDS, None)
+            if not errors:
+                return self.async_create_entry(title="", data=options)
+
+        options = self.config_entry.options
+        schema = vol.Schema({
+            vol.Optional(CONF_DEDUP_ON_ADD, default=options.get(CONF_DEDUP_ON_ADD, False)): selector.BooleanSelector(),
+            vol.Optional(
+                CONF_BANDWIDTH_SAVING, default=options.get(CONF_BANDWIDTH_SAVING, False)
+            ): selector.BooleanSelector(),
+            vol.Optional(CONF_AGGREGATE_TODO, default=options.get(CONF_AGGREGATE_TODO, False)): selector.BooleanSelector(),
+            vol.Optional(
+                CONF_AGGREGATE_LIST_IDS, default=options.get(CONF_AGGREGATE_LIST_IDS, [])
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(options=self._list_options(), multiple=True, custom_value=True)
+            ),
+            vol.Optional(
+                CONF_CPU_BUDGET_MS, default=options.get(CONF_CPU_BUDGET_MS, DEFAULT_CPU_BUDGET_MS)
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=1, max=10000, unit_of_measurement="ms", mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(
+                CONF_LAG_BUDGET_MS, default=options.get(CONF_LAG_BUDGET_MS, DEFAULT_LAG_BUDGET_MS)
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=1, max=10000, unit_of_measurement="ms", mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(
+                CONF_REPLAY_CASSETTE, description={"suggested_value": options.get(CONF_REPLAY_CASSETTE)}
+            ): selector.TextSelector(),
+            vol.Optional(CONF_REPLAY_SPEED, default=options.get(CONF_REPLAY_SPEED, 1.0)): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=0, max=100, step=0.1, mode=selector.NumberSelectorMode.BOX)
+            ),
+        })
+        if user_input is not None:
+            schema = self.add_suggested_values_to_schema(schema, user_input)
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
+
+    def _list_options(self) -> list[selector.SelectOptionDict]:
+        """The lists of the loaded entry, to pick the ones the aggregate entity shows."""
+        data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        coordinator = data.get("coordinator") if data else None
+        lists = coordinator.data.get("lists", []) if coordinator and coordinator.data else []
+        return [
+            selector.SelectOptionDict(value=str(lst["Id"]), label=lst.get("Name") or str(lst["Id"]))
+            for lst in lists
+        ]
+
+    async def _cassette_exists(self, cassette: str) -> bool:
+        try:
+            path = transfer_path(self.hass, cassette)
+        except HomeAssistantError:
+            return False
+        return await self.hass.async_add_executor_job(os.path.isfile, path)
@@ -1,10 +1,22 @@
 DOMAIN = "listonic"
-PLATFORMS = ["todo"]
+PLATFORMS = ["todo", "sensor"]
 
 CONF_DEVICE_ID = "device_id"
 CONF_REGION = "region"
 CONF_CULTURE = "culture"
 CONF_LIST_IDS = "list_ids"  # which Listonic lists to sync
+CONF_DEDUP_ON_ADD = "dedup_on_add"  # uncheck an existing item instead of adding a duplicate
+CONF_BANDWIDTH_SAVING = "bandwidth_saving"  # keep only the fields below from polled data
+CONF_AGGREGATE_TODO = "aggregate_todo"  # add a todo entity with the open items of all lists
+CONF_AGGREGATE_LIST_IDS = "aggregate_list_ids"  # lists included in it, all when empty
+CONF_CPU_BUDGET_MS = "cpu_budget_ms"  # sync work per poll cycle before degrading
+CONF_LAG_BUDGET_MS = "lag_budget_ms"  # event loop lag before degrading
+CONF_REPLAY_CASSETTE = "replay_cassette"  # serve recorded traffic instead of the Listonic API
+CONF_REPLAY_SPEED = "replay_speed"  # 1.0 is real time, 0 replays without delays
+
+# Fields kept from polled lists and items when bandwidth saving is on
+LIST_FIELDS = ("Id", "Name", "SortOrder")
+ITEM_FIELDS = ("Id", "Name", "Checked", "SortOrder")
 
 GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
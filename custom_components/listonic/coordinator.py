@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import CONF_BANDWIDTH_SAVING, ITEM_FIELDS, LIST_FIELDS
+from .history import ListonicHistory
+from .item_index import ItemChange, ListonicItemIndex
+from .listonic_api import ListonicClient
+from .profiler import MAX_UPDATE_INTERVAL, ListonicProfiler
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ListonicCoordinator(DataUpdateCoordinator):
+    """Poll all Listonic lists and their items."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        client: ListonicClient,
+        index: ListonicItemIndex,
+        history: ListonicHistory,
+        profiler: ListonicProfiler,
+    ) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name="listonic_todo",
+            update_interval=timedelta(seconds=2),  # Increased to 30 seconds for stability
+        )
+        self.client = client
+        self.index = index
+        self.history = history
+        self.profiler = profiler
+        self.changed_lists: set = set()  # lists whose name or items changed in the last poll
+        self.last_changes: list[ItemChange] = []  # item changes found by the last poll
+        self._base_interval = self.update_interval
+        profiler.add_degrade_listener(self._degraded_changed)
+
+    @callback
+    def _degraded_changed(self, degraded: bool) -> None:
+        """Poll less often while the event loop is over budget."""
+        if degraded:
+            self.update_interval = min(self._base_interval * 4, MAX_UPDATE_INTERVAL)
+        else:
+            self.update_interval = self._base_interval
+        _LOGGER.debug("Listonic poll interval is now %s", self.update_interval)
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch latest data from Listonic."""
+        trim = self.config_entry.options.get(CONF_BANDWIDTH_SAVING, False)
+        list_fields = LIST_FIELDS if trim else None
+        item_fields = ITEM_FIELDS if trim else None
+        # A failed poll still notifies listeners, which must not see the previous changes again
+        self.changed_lists = set()
+        self.last_changes = []
+        bandwidth_cycle = self.client.bandwidth.start_cycle()
+        profiler_cycle = self.profiler.start_cycle()
+        started = time.perf_counter()
+        try:
+            lists = await self.client.get_lists(list_fields)
+            previous_items = self.data.get("items", {}) if self.data else {}
+            items_by_list = {}
+            for lst in lists:
+                list_id = lst["Id"]
+                try:
+                    items = await self.client.get_items(list_id, item_fields)
+                    items_by_list[list_id] = items
+                except Exception as err:
+                    _LOGGER.error("Error fetching items for list %s: %s", list_id, err)
+                    # Keep the last known items so a transient error isn't seen as a cleared list
+                    items_by_list[list_id] = previous_items.get(list_id, [])
+            result = {"lists": lists, "items": items_by_list}
+            # Keep the name index in step with the data before listeners run
+            with self.profiler.measure("coordinator.index"):
+                update = self.index.apply(result)
+                if not update.initial:
+                    self.history.record(update.changes)
+            self.changed_lists = update.changed_lists
+            self.last_changes = update.changes
+            return result
+        except Exception as err:
+            _LOGGER.error("Error updating Listonic data: %s", err)
+            # Don't return empty data, raise the exception so coordinator can handle it
+            raise
+        finally:
+            self.client.bandwidth.end_cycle(bandwidth_cycle)
+            self.profiler.leave_cycle(profiler_cycle)
+            self.profiler.record_wall("coordinator.update", time.perf_counter() - started)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners, counting their entity updates and state writes towards the poll cycle."""
+        with self.profiler.measure("coordinator.listeners", cycle=True):
+            super().async_update_listeners()
+        self.profiler.end_cycle()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, CONF_LISTONIC_REFRESH_TOKEN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30  # seconds; several token rotations in a row become one write
+
+# Treat a token as expired this long before it actually expires
+EXPIRY_MARGIN = 60
+
+
+def credentials_storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.credentials.{entry_id}"
+
+
+class ListonicCredentialStore:
+    """Listonic access token, its expiry and the refresh token, kept together.
+
+    Rotations are persisted with a delayed, atomic write to a private file in
+    .storage instead of rewriting the config entry every time. Pending
+    changes are written on unload and, through the Store, on shutdown.
+    A store created with ``persist=False`` only lives in memory.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, *, persist: bool = True) -> None:
+        self.hass = hass
+        self._persist = persist
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, credentials_storage_key(entry_id), private=True, atomic_writes=True
+        )
+        self.access_token: str | None = None
+        self.expires_at: float | None = None  # epoch seconds, None when unknown
+        self.refresh_token: str | None = None
+        self._dirty = False
+
+    async def async_load(self, entry: ConfigEntry) -> None:
+        """Load stored credentials, taking over a refresh token kept in the config entry."""
+        data = await self._store.async_load()
+        if data:
+            self.access_token = data.get("access_token")
+            self.expires_at = data.get("expires_at")
+            self.refresh_token = data.get("refresh_token")
+
+        if CONF_LISTONIC_REFRESH_TOKEN in entry.data:
+            if not self.refresh_token:
+                self.refresh_token = entry.data[CONF_LISTONIC_REFRESH_TOKEN]
+                await self._store.async_save(self._data_to_save())
+            # Stop keeping a second, soon stale, copy in core.config_entries
+            new_data = {key: value for key, value in entry.data.items() if key != CONF_LISTONIC_REFRESH_TOKEN}
+            self.hass.config_entries.async_update_entry(entry, data=new_data)
+            _LOGGER.debug("Moved Listonic refresh token from the config entry to the credential store")
+
+    @property
+    def access_token_valid(self) -> bool:
+        """True if there is an access token that is known not to have expired."""
+        return bool(self.access_token) and self.expires_at is not None and time.time() < self.expires_at - EXPIRY_MARGIN
+
+    @callback
+    def update(self, access_token: str, expires_in: float | None = None, refresh_token: str | None = None) -> None:
+        """Remember a new access token, and refresh token if one was issued."""
+        self.access_token = access_token
+        self.expires_at = time.time() + float(expires_in) if expires_in else None
+        if refresh_token:
+            self.refresh_token = refresh_token
+        self._schedule_save()
+
+    @callback
+    def invalidate(self) -> None:
+        """Forget the access token, e.g. after the API rejected it."""
+        if self.access_token is None:
+            return
+        self.access_token = None
+        self.expires_at = None
+        self._schedule_save()
+
+    @callback
+    def _schedule_save(self) -> None:
+        if not self._persist:
+            return
+        self._dirty = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        self._dirty = False
+        return {
+            "access_token": self.access_token,
+            "expires_at": self.expires_at,
+            "refresh_token": self.refresh_token,
+        }
+
+    async def async_flush(self) -> None:
+        """Write pending changes now instead of waiting for the save delay."""
+        if self._dirty:
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
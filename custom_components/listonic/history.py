@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .item_index import ItemChange, ListonicItemIndex, normalize_name
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60  # seconds; coalesces the writes of many polls into one
+
+# The event log is only appended to. Once it holds more than MAX_EVENTS
+# events it is rewritten with the newest COMPACT_TO.
+MAX_EVENTS = 5000
+COMPACT_TO = 4000
+
+# Names with stats. Beyond MAX_ITEMS the lowest ranked are evicted down to
+# COMPACT_ITEMS_TO, names that were never bought first.
+MAX_ITEMS = 2000
+COMPACT_ITEMS_TO = 1500
+
+# Purchases lose half their weight in the ranking every HALF_LIFE seconds.
+HALF_LIFE = 30 * 24 * 3600
+
+# An item counts as "usually bought" after this many purchases.
+MIN_PURCHASES = 3
+
+EVENT_ADDED = "a"
+EVENT_CHECKED = "c"
+
+# Positions in a stats record: [name, added, purchased, first_purchase, last_purchase, rank]
+_NAME, _ADDED, _PURCHASED, _FIRST, _LAST, _RANK = range(6)
+
+
+def history_storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.history.{entry_id}"
+
+
+def _count_lines(path: str) -> int:
+    try:
+        with open(path, "rb") as fh:
+            return sum(1 for _ in fh)
+    except FileNotFoundError:
+        return 0
+
+
+def _append_lines(path: str, lines: list[str], keep: int | None) -> None:
+    """Append lines to the log, then keep only the last ``keep`` if given."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.writelines(f"{line}\n" for line in lines)
+    if keep is None:
+        return
+    with open(path, encoding="utf-8") as fh:
+        tail = deque(fh, maxlen=keep)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        fh.writelines(tail)
+    os.replace(tmp_path, path)
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ListonicHistory:
+    """Local add/check history with precomputed frequency and recency stats.
+
+    Events are appended as compact ``[timestamp, kind, key]`` lines to a log
+    in <config>/listonic, so a save never rewrites them. The aggregates, which
+    are all that suggestions read, are updated as each event is recorded and
+    are the only thing kept in the store. A history created with
+    ``persist=False`` starts empty and only lives in memory.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, *, persist: bool = True) -> None:
+        self.hass = hass
+        self._persist = persist
+        self._store: Store = Store(hass, STORAGE_VERSION, history_storage_key(entry_id))
+        self._log_path = hass.config.path(DOMAIN, f"history.{entry_id}.log")
+        self._pending: list[str] = []  # events not yet appended to the log
+        self._logged = 0  # events in the log file
+        self._write_lock = asyncio.Lock()
+        self._append_timer: Callable[[], None] | None = None
+        self._unsub_final_write: Callable[[], None] | None = None
+        self._stats: dict[str, list[Any]] = {}
+        self._ranked: list[str] | None = None  # keys by rank, rebuilt only after a change
+
+    async def async_load(self) -> None:
+        if not self._persist:
+            return
+        data = await self._store.async_load()
+        self._logged = await self.hass.async_add_executor_job(_count_lines, self._log_path)
+        if not data:
+            return
+        self._stats = data.get("stats", {})
+        self._ranked = None
+        if len(self._stats) > MAX_ITEMS:
+            self._compact()
+
+    async def async_flush(self) -> None:
+        """Write pending changes now instead of waiting for the save delay."""
+        if not self._persist:
+            return
+        self._cancel_append()
+        await self._async_append_events()
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        self._cancel_append()
+        self._pending.clear()
+        await self._store.async_remove()
+        async with self._write_lock:
+            await self.hass.async_add_executor_job(_remove_file, self._log_path)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"stats": self._stats}
+
+    @callback
+    def _schedule_save(self) -> None:
+        if not self._persist:
+            return
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        if self._append_timer is None:
+            self._append_timer = async_call_later(self.hass, SAVE_DELAY, self._async_append_later)
+        if self._unsub_final_write is None:
+            # Like the store, write what is pending when Home Assistant shuts down
+            self._unsub_final_write = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+            )
+
+    @callback
+    def _cancel_append(self) -> None:
+        if self._append_timer is not None:
+            self._append_timer()
+            self._append_timer = None
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+
+    async def _async_append_later(self, _now: Any) -> None:
+        self._append_timer = None
+        await self._async_append_events()
+
+    async def _async_final_write(self, _event: Event) -> None:
+        self._unsub_final_write = None
+        await self._async_append_events()
+
+    async def _async_append_events(self) -> None:
+        async with self._write_lock:
+            lines, self._pending = self._pending, []
+            if not lines:
+                return
+            self._logged += len(lines)
+            keep = None
+            if self._logged > MAX_EVENTS:
+                _LOGGER.debug("Compacting Listonic history log, dropping %s events", self._logged - COMPACT_TO)
+                keep = self._logged = COMPACT_TO
+            await self.hass.async_add_executor_job(_append_lines, self._log_path, lines, keep)
+
+    @callback
+    def record(self, changes: list[ItemChange]) -> None:
+        """Append events for items that were added or checked off."""
+        now = int(time.time())
+        recorded = False
+        for change in changes:
+            if change.kind == "added":
+                self._append(now, EVENT_ADDED, change.item.key, change.item.name)
+                recorded = True
+            elif change.kind == "checked":
+                self._append(now, EVENT_CHECKED, change.item.key, change.item.name)
+                recorded = True
+
+        if not recorded:
+            return
+        if len(self._stats) > MAX_ITEMS:
+            self._compact()
+        self._schedule_save()
+
+    def _append(self, ts: int, kind: str, key: str, name: str) -> None:
+        if not key:
+            return
+        if self._persist:
+            self._pending.append(json.dumps([ts, kind, key], separators=(",", ":"), ensure_ascii=False))
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = [name, 0, 0, None, None, None]
+        stats[_NAME] = name
+        if kind == EVENT_ADDED:
+            stats[_ADDED] += 1
+            return
+
+        stats[_PURCHASED] += 1
+        if stats[_FIRST] is None:
+            stats[_FIRST] = ts
+        stats[_LAST] = ts
+        # The decayed score at time t is 2 ** (rank - t / HALF_LIFE), so ordering
+        # by rank is the same at any point in time and never needs recomputing.
+        rank = ts / HALF_LIFE
+        previous = stats[_RANK]
+        if previous is None:
+            stats[_RANK] = rank
+        else:
+            high, low = max(previous, rank), min(previous, rank)
+            stats[_RANK] = high + math.log2(1 + 2 ** (low - high))
+        self._ranked = None
+
+    def _compact(self) -> None:
+        """Evict the lowest ranked names, those never bought first."""
+        def _eviction_order(key: str) -> tuple[bool, float, int]:
+            stats = self._stats[key]
+            return (stats[_RANK] is not None, stats[_RANK] or 0.0, stats[_ADDED])
+
+        evicted = sorted(self._stats, key=_eviction_order)[: len(self._stats) - COMPACT_ITEMS_TO]
+        for key in evicted:
+            del self._stats[key]
+        self._ranked = None
+        _LOGGER.debug("Compacted Listonic history, evicted %s names", len(evicted))
+
+    def _ranking(self) -> list[str]:
+        if self._ranked is None:
+            purchased = [key for key, stats in self._stats.items() if stats[_PURCHASED]]
+            purchased.sort(key=lambda key: self._stats[key][_RANK], reverse=True)
+            self._ranked = purchased
+        return self._ranked
+
+    def _as_dict(self, key: str) -> dict[str, Any]:
+        stats = self._stats[key]
+        return {
+            "name": stats[_NAME],
+            "purchases": stats[_PURCHASED],
+            "added": stats[_ADDED],
+            "last_purchased": stats[_LAST],
+        }
+
+    def suggest(
+        self,
+        index: ListonicItemIndex | None = None,
+        *,
+        limit: int = 10,
+        prefix: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return the most frequently and recently bought items.
+
+        Items that are already open on a list are skipped when an index is given.
+        """
+        wanted = normalize_name(prefix) if prefix else None
+        suggestions = []
+        for key in self._ranking():
+            if wanted and not key.startswith(wanted):
+                continue
+            if index is not None and index.contains(key, include_checked=False):
+                continue
+            suggestions.append(self._as_dict(key))
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+    def missing(self, index: ListonicItemIndex, now: float | None = None) -> list[dict[str, Any]]:
+        """Items that are usually bought, are due again and aren't on any list."""
+        now = time.time() if now is None else now
+        missing = []
+        for key in self._ranking():
+            stats = self._stats[key]
+            if stats[_PURCHASED] < MIN_PURCHASES:
+                continue
+            interval = (stats[_LAST] - stats[_FIRST]) / (stats[_PURCHASED] - 1)
+            # Purchases seen at one moment (one poll, several lists) give no interval
+            if interval <= 0 or now - stats[_LAST] < interval:
+                continue
+            if index.contains(key, include_checked=False):
+                continue
+            missing.append(self._as_dict(key))
+        return missing
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import logging
+import unicodedata
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def normalize_name(name: str) -> str:
+    """Fold case, accents and whitespace so "Lätte  " and "latte" match."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+@dataclass(slots=True)
+class IndexedItem:
+    """A single Listonic item as seen by the index."""
+
+    list_id: Any
+    item_id: int
+    name: str
+    key: str
+    checked: bool
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "list_id": self.list_id,
+            "id": self.item_id,
+            "name": self.name,
+            "checked": self.checked,
+        }
+
+
+@dataclass(slots=True)
+class ItemChange:
+    """One item-level difference between two coordinator snapshots."""
+
+    kind: str  # "added", "removed", "renamed", "checked" or "unchecked"
+    item: IndexedItem
+
+
+class IndexUpdate(NamedTuple):
+    """Result of applying a coordinator snapshot to the index."""
+
+    initial: bool
+    changes: list[ItemChange]
+    changed_lists: set
+
+
+class ListonicItemIndex:
+    """Cross-list, normalised name index maintained from coordinator data.
+
+    Only items whose name or checked state differs from the previous snapshot
+    are touched, so a poll with no changes costs one dict lookup per item.
+    """
+
+    def __init__(self) -> None:
+        self._items: dict[Any, dict[int, IndexedItem]] = {}
+        self._by_key: dict[str, dict[tuple[Any, int], IndexedItem]] = {}
+        self._keys: list[str] = []  # sorted, for prefix search
+        self._list_names: dict[Any, str] = {}
+        self.ready = False
+
+    def apply(self, data: dict[str, Any]) -> IndexUpdate:
+        """Bring the index in line with a coordinator snapshot."""
+        changes: list[ItemChange] = []
+        changed_lists: set = set()
+        items_by_list = data.get("items", {})
+        seen_lists = set()
+
+        for lst in data.get("lists", []):
+            list_id = lst["Id"]
+            seen_lists.add(list_id)
+            list_name = lst.get("Name", "")
+            if self._list_names.get(list_id) != list_name:
+                self._list_names[list_id] = list_name
+                changed_lists.add(list_id)
+            list_changes = self._apply_list(list_id, items_by_list.get(list_id, []))
+            if list_changes:
+                changed_lists.add(list_id)
+                changes.extend(list_changes)
+
+        for list_id in set(self._items) - seen_lists:
+            for item in self._items.pop(list_id).values():
+                self._unlink(item)
+                changes.append(ItemChange("removed", item))
+            self._list_names.pop(list_id, None)
+            changed_lists.add(list_id)
+
+        initial = not self.ready
+        self.ready = True
+        return IndexUpdate(initial, changes, changed_lists)
+
+    def _apply_list(self, list_id: Any, items: list[dict[str, Any]]) -> list[ItemChange]:
+        current = self._items.setdefault(list_id, {})
+        changes: list[ItemChange] = []
+        seen: set[int] = set()
+
+        for raw in items:
+            item_id = raw["Id"]
+            seen.add(item_id)
+            name = raw.get("Name") or ""
+            checked = bool(raw.get("Checked"))
+            existing = current.get(item_id)
+
+            if existing is None:
+                new_item = IndexedItem(list_id, item_id, name, normalize_name(name), checked)
+                current[item_id] = new_item
+                self._link(new_item)
+                changes.append(ItemChange("added", new_item))
+                continue
+
+            if existing.name != name:
+                self._unlink(existing)
+                existing.name = name
+                existing.key = normalize_name(name)
+                self._link(existing)
+                changes.append(ItemChange("renamed", existing))
+
+            if existing.checked != checked:
+                existing.checked = checked
+                changes.append(ItemChange("checked" if checked else "unchecked", existing))
+
+        if len(seen) != len(current):
+            for item_id in [item_id for item_id in current if item_id not in seen]:
+                removed = current.pop(item_id)
+                self._unlink(removed)
+                changes.append(ItemChange("removed", removed))
+
+        return changes
+
+    def _link(self, item: IndexedItem) -> None:
+        bucket = self._by_key.get(item.key)
+        if bucket is None:
+            bucket = self._by_key[item.key] = {}
+            insort(self._keys, item.key)
+        bucket[(item.list_id, item.item_id)] = item
+
+    def _unlink(self, item: IndexedItem) -> None:
+        bucket = self._by_key.get(item.key)
+        if bucket is None:
+            return
+        bucket.pop((item.list_id, item.item_id), None)
+        if not bucket:
+            del self._by_key[item.key]
+            pos = bisect_left(self._keys, item.key)
+            if pos < len(self._keys) and self._keys[pos] == item.key:
+                del self._keys[pos]
+
+    def list_name(self, list_id: Any) -> str | None:
+        return self._list_names.get(list_id)
+
+    def items(self, list_id: Any | None = None):
+        """Iterate over indexed items, optionally restricted to one list."""
+        if list_id is None:
+            for list_items in self._items.values():
+                yield from list_items.values()
+            return
+        for known_id, list_items in self._items.items():
+            if str(known_id) == str(list_id):
+                yield from list_items.values()
+
+    def contains(self, name: str, *, include_checked: bool = True) -> bool:
+        """Return True if any list holds an item with this name."""
+        bucket = self._by_key.get(normalize_name(name))
+        if not bucket:
+            return False
+        return include_checked or any(not item.checked for item in bucket.values())
+
+    def find(
+        self,
+        name: str,
+        *,
+        list_id: Any | None = None,
+        prefix: bool = False,
+        include_checked: bool = True,
+        limit: int | None = None,
+    ) -> list[IndexedItem]:
+        """Look up items by normalised name, or by name prefix."""
+        key = normalize_name(name)
+        if prefix:
+            buckets = []
+            pos = bisect_left(self._keys, key)
+            while pos < len(self._keys) and self._keys[pos].startswith(key):
+                buckets.append(self._by_key[self._keys[pos]])
+                pos += 1
+        else:
+            bucket = self._by_key.get(key)
+            buckets = [bucket] if bucket else []
+
+        matches: list[IndexedItem] = []
+        for bucket in buckets:
+            for item in bucket.values():
+                if list_id is not None and str(item.list_id) != str(list_id):
+                    continue
+                if not include_checked and item.checked:
+                    continue
+                matches.append(item)
+                if limit is not None and len(matches) >= limit:
+                    return matches
+        return matches
+
+
+async def async_add_item(
+    client,
+    index: ListonicItemIndex,
+    list_id: Any,
+    name: str,
+    dedup: bool = False,
+) -> dict[str, Any]:
+    """Add an item, or with dedup uncheck an existing item of the same name.
+
+    An open item of that name wins over checked ones, so dedup never leaves
+    two open copies.
+    """
+    if dedup:
+        existing = index.find(name, list_id=list_id)
+        if existing:
+            item = next((match for match in existing if not match.checked), existing[0])
+            if item.checked:
+                _LOGGER.debug("Unchecking existing item %s instead of adding %s", item.item_id, name)
+                await client.update_item(list_id, item.item_id, checked=False)
+            else:
+                _LOGGER.debug("Item %s already on list %s, not adding", name, list_id)
+            return {"Id": item.item_id, "Name": item.name, "deduplicated": True}
+    return await client.add_item(list_id, name)
@@ -1,42 +1,191 @@
 import aiohttp
+import asyncio
 import logging
+import re
+import time
+from collections.abc import AsyncIterator, Iterable
+from contextvars import ContextVar, Token
+from typing import Any
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_entry_oauth2_flow
 from homeassistant.exceptions import ConfigEntryNotReady
-from .const import DOMAIN, CONF_REGION, CONF_CULTURE, CONF_DEVICE_ID, CONF_LISTONIC_REFRESH_TOKEN
+from homeassistant.util.json import json_loads
+from .const import DOMAIN, CONF_REGION, CONF_CULTURE, CONF_DEVICE_ID
+from .credentials import ListonicCredentialStore
+from .transport import HttpTransport, ListonicResponse, RecordingTransport, ReplayTransport
 
 _LOGGER = logging.getLogger(__name__)
 
 # Hardcoded ClientAuthorization value from your working code
 CLIENT_AUTH_B64 = "bGlzdG9uaWNhbmRyb2lkOmkxZldYd3dYTzZVSVdlemNaeWt4"
 
+# In degraded mode, bodies larger than this are decoded in the executor
+LARGE_BODY_BYTES = 256 * 1024
+
+_ID_IN_PATH = re.compile(r"/\d+")
+
+
+def _json_or_empty(resp: ListonicResponse, what: str):
+    """Return the JSON body of a response, or {} when it isn't JSON."""
+    # Check if response has JSON content before trying to parse it
+    content_type = resp.headers.get("Content-Type", "")
+    if "application/json" in content_type:
+        return resp.json()
+    # For non-JSON responses, just return an empty dict
+    _LOGGER.debug("Non-JSON response received for %s, returning empty dict", what)
+    return {}
+
+
+def _trim(records: list[dict], fields: tuple[str, ...] | None) -> list[dict]:
+    """Keep only the given fields of each record, so unused data isn't held in memory."""
+    if fields is None:
+        return records
+    return [{key: record[key] for key in fields if key in record} for record in records]
+
+
+class ListonicAuthError(RuntimeError):
+    """Listonic rejected the access token."""
+
+
+# Counters of the poll cycle running in the current task, if any
+_poll_cycle: ContextVar[dict[str, int] | None] = ContextVar("listonic_poll_cycle", default=None)
+
+
+def _empty_cycle() -> dict[str, int]:
+    return {"wire_bytes": 0, "decoded_bytes": 0, "requests": 0}
+
+
+class BandwidthStats:
+    """Bytes received from Listonic, in total and for the last poll cycle.
+
+    Only requests made from the task that called start_cycle() count towards
+    the cycle, so service calls running meanwhile don't inflate it.
+    """
+
+    def __init__(self) -> None:
+        self.wire_bytes = 0  # as sent by the server, possibly compressed
+        self.decoded_bytes = 0  # after decompression
+        self.requests = 0
+        self.last_cycle: dict[str, int] = _empty_cycle()
+
+    def record(self, wire_bytes: int, decoded_bytes: int) -> None:
+        self.wire_bytes += wire_bytes
+        self.decoded_bytes += decoded_bytes
+        self.requests += 1
+        if (cycle := _poll_cycle.get()) is not None:
+            cycle["wire_bytes"] += wire_bytes
+            cycle["decoded_bytes"] += decoded_bytes
+            cycle["requests"] += 1
+
+    def start_cycle(self) -> Token:
+        return _poll_cycle.set(_empty_cycle())
+
+    def end_cycle(self, token: Token) -> None:
+        self.last_cycle = _poll_cycle.get() or _empty_cycle()
+        _poll_cycle.reset(token)
+
+    @property
+    def compression_ratio(self) -> float | None:
+        """Decoded size divided by transferred size, over all requests."""
+        if not self.wire_bytes:
+            return None
+        return round(self.decoded_bytes / self.wire_bytes, 2)
+
 
 class ListonicClient:
     """Handles communication with Listonic API."""
 
-    def __init__(self, hass: HomeAssistant, oauth_session: config_entry_oauth2_flow.OAuth2Session, entry):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        oauth_session: config_entry_oauth2_flow.OAuth2Session,
+        entry,
+        credentials: ListonicCredentialStore,
+        transport=None,
+    ):
         self.hass = hass
         self.session = oauth_session
         self.entry = entry
-        self._listonic_token = None
-        self._listonic_refresh_token = None  # Store Listonic refresh token
-        
-        # If we have a stored refresh token, set it
-        if CONF_LISTONIC_REFRESH_TOKEN in entry.data:
-            self._listonic_refresh_token = entry.data[CONF_LISTONIC_REFRESH_TOKEN]
+        self.credentials = credentials  # Listonic access and refresh token
+        self._token_lock = asyncio.Lock()  # one login at a time when requests run concurrently
+        # Anything with an async request() returning a ListonicResponse, see transport.py
+        self.transport = transport or HttpTransport(hass)
+        # Cassettes hold no usable tokens, so replay never logs in
+        self.replay = isinstance(self.transport, ReplayTransport)
+        self.bandwidth = BandwidthStats()
+        self.profiler = None  # set by the integration, see profiler.py
             
     @classmethod
     async def from_config_entry(cls, hass, entry):
         from .oauth2 import get_oauth_implementation
         implementation = get_oauth_implementation(hass, entry)
         session = config_entry_oauth2_flow.OAuth2Session(hass, entry, implementation)
-        return cls(hass, session, entry)
+        credentials = ListonicCredentialStore(hass, entry.entry_id)
+        await credentials.async_load(entry)
+        return cls(hass, session, entry, credentials)
+
+    async def async_close(self) -> None:
+        """Close the transport, flushing any recording in progress."""
+        await self.transport.async_close()
+
+    @property
+    def recording(self) -> bool:
+        return isinstance(self.transport, RecordingTransport)
+
+    def start_recording(self, path: str) -> None:
+        """Record sanitised traffic to a cassette file until stop_recording()."""
+        if self.recording:
+            raise RuntimeError("Already recording Listonic traffic")
+        self.transport = RecordingTransport(self.hass, self.transport, path)
+
+    async def stop_recording(self) -> dict[str, Any]:
+        """Stop recording and write the rest of the cassette."""
+        if not self.recording:
+            raise RuntimeError("Listonic traffic is not being recorded")
+        recorder = self.transport
+        self.transport = recorder.inner
+        await recorder.async_flush()
+        return {"path": recorder.path, "requests": recorder.records}
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        *,
+        json: Any = None,
+        data: Any = None,
+        timeout: aiohttp.ClientTimeout | None = None,
+    ) -> ListonicResponse:
+        """Send a request through the transport, recording transferred and decoded bytes."""
+        started = time.perf_counter()
+        resp = await self.transport.request(method, url, headers=headers, json=json, data=data, timeout=timeout)
+        self.bandwidth.record(resp.wire_bytes, len(resp.body))
+        path = _ID_IN_PATH.sub("/{id}", url.split("://", 1)[-1].split("?", 1)[0])
+        if self.profiler is not None:
+            self.profiler.record_wall(f"client.{method} {path}", time.perf_counter() - started)
+        if resp.status == 401 and "Authorization" in headers:
+            if not self.replay:
+                # Rejected before its expiry, get a new one on the next call
+                self.credentials.invalidate()
+            raise ListonicAuthError(f"Listonic rejected the access token: {method} {path}")
+        return resp
+
+    async def _decode(self, resp: ListonicResponse, what: str):
+        """Decode a JSON body, off the event loop if it is large and the loop is struggling."""
+        if self.profiler is None:
+            return resp.json()
+        if self.profiler.degraded and len(resp.body) > LARGE_BODY_BYTES:
+            return await self.hass.async_add_executor_job(json_loads, resp.body)
+        with self.profiler.measure(f"decode.{what}"):
+            return resp.json()
 
     async def _auth_headers(self) -> dict[str, str]:
         """Return headers with valid Listonic token."""
-        await self._ensure_listonic_token()
+        if not self.replay:
+            await self._ensure_listonic_token()
         return {
-            "Authorization": f"Bearer {self._listonic_token}",
+            "Authorization": f"Bearer {self.credentials.access_token}",
             "Culture": self.entry.options.get(CONF_CULTURE, "it-IT"),
             "RegionCode": self.entry.options.get(CONF_REGION, "it"),
             "ClientAuthorization": f"Basic {CLIENT_AUTH_B64}",
@@ -46,29 +195,36 @@ class ListonicClient:
         }
 
     async def _ensure_listonic_token(self):
-        if self._listonic_token:
-            # Simple token validation by making a test request
+        if self.credentials.access_token_valid:
+            return  # Not expired yet, no need to check with the server
+        async with self._token_lock:
+            if self.credentials.access_token_valid:
+                return  # Another request logged in while we waited
+            await self._validate_or_renew_token()
+
+    async def _validate_or_renew_token(self):
+        if self.credentials.access_token:
+            # Expiry unknown: simple token validation by making a test request
             try:
                 test_headers = {
-                    "Authorization": f"Bearer {self._listonic_token}",
+                    "Authorization": f"Bearer {self.credentials.access_token}",
                     "Culture": self.entry.options.get(CONF_CULTURE, "it-IT"),
                     "RegionCode": self.entry.options.get(CONF_REGION, "it"),
                     "ClientAuthorization": f"Basic {CLIENT_AUTH_B64}",
                 }
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        "https://api.listonic.com/api/lists",
-                        headers=test_headers,
-                        timeout=aiohttp.ClientTimeout(total=10)
-                    ) as resp:
-                        if resp.status == 200:
-                            return  # Token is still valid
-                        elif resp.status == 401:
-                            _LOGGER.debug("Token expired, will refresh")
-                            self._listonic_token = None
+                resp = await self._request(
+                    "GET",
+                    "https://api.listonic.com/api/lists",
+                    test_headers,
+                    timeout=aiohttp.ClientTimeout(total=10),
+                )
+                if resp.status == 200:
+                    return  # Token is still valid
+            except ListonicAuthError:
+                _LOGGER.debug("Token expired, will refresh")  # already invalidated
             except Exception:
                 _LOGGER.debug("Token validation failed, will refresh")
-                self._listonic_token = None
+                self.credentials.invalidate()
 
         # If we get here, we need to get a new token
         await self._get_new_listonic_token()
@@ -78,7 +234,7 @@ class ListonicClient:
         _LOGGER.debug("Getting new Listonic token")
         
         # First, try to use the Listonic refresh token if we have one
-        if self._listonic_refresh_token:
+        if self.credentials.refresh_token:
             try:
                 _LOGGER.debug("Trying to get token using Listonic refresh token")
                 headers = {
@@ -88,36 +244,28 @@ class ListonicClient:
                     "ClientAuthorization": f"Basic {CLIENT_AUTH_B64}",
                 }
                 
-                payload = f"refresh_token={self._listonic_refresh_token}"
+                payload = f"refresh_token={self.credentials.refresh_token}"
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        "https://api.listonic.com/api/loginextended?provider=refresh_token",
-                        headers=headers,
-                        data=payload,
-                        timeout=aiohttp.ClientTimeout(total=30)
-                    ) as resp:
-                        if resp.status == 200:
-                            data = await resp.json()
-                            self._listonic_token = data.get("access_token")
-                            new_refresh_token = data.get("refresh_token")
-                            
-                            if self._listonic_token:
-                                _LOGGER.debug("Successfully got Listonic token using refresh token")
-                                
-                                # Update refresh token if we got a new one
-                                if new_refresh_token and new_refresh_token != self._listonic_refresh_token:
-                                    self._listonic_refresh_token = new_refresh_token
-                                    # Update the config entry
-                                    new_data = {**self.entry.data, CONF_LISTONIC_REFRESH_TOKEN: new_refresh_token}
-                                    self.hass.config_entries.async_update_entry(self.entry, data=new_data)
-                                    _LOGGER.debug("Updated Listonic refresh token in config entry")
-                                
-                                return
-                        else:
-                            _LOGGER.warning("Listonic refresh token failed with status %s", resp.status)
-                            text = await resp.text()
-                            _LOGGER.debug("Response: %s", text[:100] if text else "Empty response")
+                resp = await self._request(
+                    "POST",
+                    "https://api.listonic.com/api/loginextended?provider=refresh_token",
+                    headers,
+                    data=payload,
+                    timeout=aiohttp.ClientTimeout(total=30),
+                )
+                if resp.status == 200:
+                    data = resp.json()
+                    access_token = data.get("access_token")
+                    
+                    if access_token:
+                        _LOGGER.debug("Successfully got Listonic token using refresh token")
+                        # Keeps the refresh token if no new one was issued; persisted with a delay
+                        self.credentials.update(access_token, data.get("expires_in"), data.get("refresh_token"))
+                        return
+                else:
+                    _LOGGER.warning("Listonic refresh token failed with status %s", resp.status)
+                    text = resp.text()
+                    _LOGGER.debug("Response: %s", text[:100] if text else "Empty response")
                             
             except Exception as err:
                 _LOGGER.warning("Error getting Listonic token with refresh token: %s", err)
@@ -151,33 +299,27 @@ class ListonicClient:
         payload = f"token={google_access_token}"
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.listonic.com/api/loginextended?automerge=1&autodestruct=1&provider=google",
-                    headers=headers,
-                    data=payload,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as resp:
-                    if resp.status != 200:
-                        text = await resp.text()
-                        _LOGGER.error("Listonic login failed: %s %s", resp.status, text)
-                        raise ConfigEntryNotReady(f"Listonic login failed: {resp.status}")
-                    
-                    data = await resp.json()
-                    self._listonic_token = data.get("access_token")
-                    new_refresh_token = data.get("refresh_token")
-                    
-                    if not self._listonic_token:
-                        raise ConfigEntryNotReady("No access token returned from Listonic")
-                    
-                    # Update the refresh token in config entry
-                    if new_refresh_token:
-                        self._listonic_refresh_token = new_refresh_token
-                        new_data = {**self.entry.data, CONF_LISTONIC_REFRESH_TOKEN: new_refresh_token}
-                        self.hass.config_entries.async_update_entry(self.entry, data=new_data)
-                        _LOGGER.debug("Stored new Listonic refresh token")
-                        
-                    _LOGGER.debug("Successfully obtained new Listonic token using Google token")
+            resp = await self._request(
+                "POST",
+                "https://api.listonic.com/api/loginextended?automerge=1&autodestruct=1&provider=google",
+                headers,
+                data=payload,
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+            if resp.status != 200:
+                text = resp.text()
+                _LOGGER.error("Listonic login failed: %s %s", resp.status, text)
+                raise ConfigEntryNotReady(f"Listonic login failed: {resp.status}")
+            
+            data = resp.json()
+            access_token = data.get("access_token")
+            
+            if not access_token:
+                raise ConfigEntryNotReady("No access token returned from Listonic")
+            
+            self.credentials.update(access_token, data.get("expires_in"), data.get("refresh_token"))
+                
+            _LOGGER.debug("Successfully obtained new Listonic token using Google token")
                     
         except Exception as err:
             _LOGGER.error("Failed to obtain Listonic token: %s", err)
@@ -187,59 +329,87 @@ class ListonicClient:
 
     async def get_sync_configuration(self):
         headers = await self._auth_headers()
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://api.listonic.com/api/syncconfiguration",
-                headers=headers,
-            ) as resp:
-                if resp.status != 200:
-                    text = await resp.text()
-                    raise RuntimeError(f"Listonic sync configuration failed: {resp.status} {text}")
-                return await resp.json()
-
-    async def get_lists(self):
+        resp = await self._request("GET", "https://api.listonic.com/api/syncconfiguration", headers)
+        if resp.status != 200:
+            raise RuntimeError(f"Listonic sync configuration failed: {resp.status} {resp.text()}")
+        return resp.json()
+
+    async def get_lists(self, fields: tuple[str, ...] | None = None):
+        """Return all lists, reduced to ``fields`` when given."""
         headers = await self._auth_headers()
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://api.listonic.com/api/lists",
-                headers=headers,
-            ) as resp:
-                if resp.status != 200:
-                    raise RuntimeError(f"get_lists failed: {resp.status}")
-                return await resp.json()
-
-    async def get_items(self, list_id: str):
+        resp = await self._request("GET", "https://api.listonic.com/api/lists", headers)
+        if resp.status != 200:
+            raise RuntimeError(f"get_lists failed: {resp.status}")
+        return _trim(await self._decode(resp, "lists"), fields)
+
+    async def get_items(self, list_id: str, fields: tuple[str, ...] | None = None):
+        """Return the items of a list, reduced to ``fields`` when given."""
         headers = await self._auth_headers()
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"https://api.listonic.com/api/lists/{list_id}/items",
-                headers=headers,
-            ) as resp:
-                if resp.status != 200:
-                    raise RuntimeError(f"get_items failed: {resp.status}")
-                return await resp.json()
+        resp = await self._request("GET", f"https://api.listonic.com/api/lists/{list_id}/items", headers)
+        if resp.status != 200:
+            raise RuntimeError(f"get_items failed: {resp.status}")
+        return _trim(await self._decode(resp, "items"), fields)
+
+    async def iter_lists(self) -> AsyncIterator[dict]:
+        """Yield lists one at a time."""
+        for lst in await self.get_lists():
+            yield lst
+
+    async def iter_items(
+        self, lists: Iterable[dict] | None = None, *, prefetch: int = 2
+    ) -> AsyncIterator[tuple[dict, dict]]:
+        """Yield (list, item) pairs for all lists, or the given ones, in order.
+
+        Items of up to ``prefetch`` lists are fetched ahead of the consumer. When
+        the consumer is slow the queue fills up and fetching pauses, so only a
+        few lists are held in memory however large the account is. Closing the
+        iterator, e.g. with ``contextlib.aclosing`` around a loop that may
+        break early, cancels the outstanding fetches.
+        """
+        if lists is None:
+            lists = await self.get_lists()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(prefetch, 1))
+
+        async def _produce() -> None:
+            for lst in lists:
+                fetch = asyncio.ensure_future(self.get_items(lst["Id"]))
+                try:
+                    await queue.put((lst, fetch))
+                except asyncio.CancelledError:
+                    fetch.cancel()
+                    raise
+            await queue.put(None)
+
+        producer = asyncio.create_task(_produce())
+        try:
+            while (entry := await queue.get()) is not None:
+                lst, fetch = entry
+                items = await fetch
+                for item in items:
+                    yield lst, item
+                del items
+        finally:
+            producer.cancel()
+            while not queue.empty():
+                entry = queue.get_nowait()
+                if entry is None:
+                    continue
+                fetch = entry[1]
+                if not fetch.done():
+                    fetch.cancel()
+                elif not fetch.cancelled():
+                    fetch.exception()  # retrieve it, so a failed prefetch isn't logged as never retrieved
 
     async def add_item(self, list_id: str, name: str):
         headers = await self._auth_headers()
         payload = {"Name": name}
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"https://api.listonic.com/api/lists/{list_id}/items",
-                headers=headers,
-                json=payload,
-            ) as resp:
-                # Accept both 200 (OK) and 201 (Created) as success
-                if resp.status not in [200, 201]:
-                    raise RuntimeError(f"add_item failed: {resp.status}")
-                
-                # Check if response has JSON content before trying to parse it
-                content_type = resp.headers.get('Content-Type', '')
-                if 'application/json' in content_type:
-                    return await resp.json()
-                else:
-                    # For non-JSON responses, just return an empty dict
-                    _LOGGER.debug("Non-JSON response received for add_item, returning empty dict")
-                    return {}
+        resp = await self._request(
+            "POST", f"https://api.listonic.com/api/lists/{list_id}/items", headers, json=payload
+        )
+        # Accept both 200 (OK) and 201 (Created) as success
+        if resp.status not in [200, 201]:
+            raise RuntimeError(f"add_item failed: {resp.status}")
+        return _json_or_empty(resp, "add_item")
 
     async def delete_items(self, list_id: str, ids: list[int]):
         headers = await self._auth_headers()
@@ -247,28 +417,22 @@ class ListonicClient:
         # Use the correct endpoint and method from your working example
         url = f"https://api.listonic.com/api/lists/{list_id}/multipleitems"
         
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(
-                url,
-                headers=headers,
-                json=ids,  # Send the IDs array directly as the request body
-            ) as resp:
-                # Accept both 200 (OK) and 204 (No Content) as success
-                if resp.status not in [200, 204]:
-                    text = await resp.text()
-                    raise RuntimeError(f"delete_items failed: {resp.status} {text}")
-                
-                # Check if response has JSON content before trying to parse it
-                content_type = resp.headers.get('Content-Type', '')
-                if 'application/json' in content_type:
-                    return await resp.json()
-                else:
-                    # For non-JSON responses, just return an empty dict
-                    _LOGGER.debug("Non-JSON response received for delete_items, returning empty dict")
-                    return {}
+        # Send the IDs array directly as the request body
+        resp = await self._request("DELETE", url, headers, json=ids)
+        # Accept both 200 (OK) and 204 (No Content) as success
+        if resp.status not in [200, 204]:
+            raise RuntimeError(f"delete_items failed: {resp.status} {resp.text()}")
+        return _json_or_empty(resp, "delete_items")
                     
-    async def update_item(self, list_id: str, item_id: int, checked: bool | None = None, name: str | None = None):
-        """Update (check/uncheck or rename) a Listonic item."""
+    async def update_item(
+        self,
+        list_id: str,
+        item_id: int,
+        checked: bool | None = None,
+        name: str | None = None,
+        sort_order: int | None = None,
+    ):
+        """Update (check/uncheck, rename or reorder) a Listonic item."""
         try:
             headers = await self._auth_headers()
             payload: dict[str, object] = {}
@@ -278,31 +442,52 @@ class ListonicClient:
             if name is not None:
                 payload["Name"] = name
                 _LOGGER.debug("Updating item %s in list %s: name=%s", item_id, list_id, name)
+            if sort_order is not None:
+                payload["SortOrder"] = sort_order
+                _LOGGER.debug("Updating item %s in list %s: sort_order=%s", item_id, list_id, sort_order)
 
             url = f"https://api.listonic.com/api/lists/{list_id}/items/{item_id}"
 
-            async with aiohttp.ClientSession() as session:
-                async with session.patch(url, headers=headers, json=payload) as resp:
-                    if resp.status != 200:
-                        text = await resp.text()
-                        _LOGGER.error("update_item failed: %s %s", resp.status, text)
-                        raise RuntimeError(f"update_item failed: {resp.status} {text}")
-                    
-                    _LOGGER.debug("Successfully updated item %s in list %s", item_id, list_id)
-                    
-                    # Check if response has JSON content before trying to parse it
-                    content_type = resp.headers.get('Content-Type', '')
-                    if 'application/json' in content_type:
-                        return await resp.json()
-                    else:
-                        # For non-JSON responses, just return an empty dict
-                        _LOGGER.debug("Non-JSON response received for update_item, returning empty dict")
-                        return {}
+            resp = await self._request("PATCH", url, headers, json=payload)
+            if resp.status != 200:
+                text = resp.text()
+                _LOGGER.error("update_item failed: %s %s", resp.status, text)
+                raise RuntimeError(f"update_item failed: {resp.status} {text}")
+            
+            _LOGGER.debug("Successfully updated item %s in list %s", item_id, list_id)
+            return _json_or_empty(resp, "update_item")
                     
         except Exception as err:
             _LOGGER.error("Error in update_item: %s", err)
             raise
 
+    async def update_items_sort_order(self, list_id: str, sort_orders: dict[int, int]):
+        """Set the SortOrder of several items of a list in one request.
+
+        Falls back to one PATCH per item, a few at a time, if the batch
+        endpoint is not accepted.
+        """
+        if not sort_orders:
+            return {}
+        headers = await self._auth_headers()
+        url = f"https://api.listonic.com/api/lists/{list_id}/multipleitems"
+        payload = [{"Id": item_id, "SortOrder": sort_order} for item_id, sort_order in sort_orders.items()]
+        resp = await self._request("PATCH", url, headers, json=payload)
+        if resp.status in [200, 204]:
+            return _json_or_empty(resp, "update_items_sort_order")
+        if resp.status not in [400, 404, 405]:
+            raise RuntimeError(f"update_items_sort_order failed: {resp.status} {resp.text()}")
+
+        _LOGGER.debug("Batch reorder not accepted (%s), updating %s items one by one", resp.status, len(sort_orders))
+        semaphore = asyncio.Semaphore(4)
+
+        async def _update(item_id: int, sort_order: int):
+            async with semaphore:
+                return await self.update_item(list_id, item_id, sort_order=sort_order)
+
+        await asyncio.gather(*(_update(item_id, order) for item_id, order in sort_orders.items()))
+        return {}
+
     async def create_list(self, name: str):
         """Create a new list in Listonic."""
         headers = await self._auth_headers()
@@ -315,66 +500,27 @@ class ListonicClient:
             "Items": []
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                "https://api.listonic.com/api/lists",
-                headers=headers,
-                json=payload,
-            ) as resp:
-                if resp.status not in [200, 201]:
-                    text = await resp.text()
-                    raise RuntimeError(f"create_list failed: {resp.status} {text}")
-                
-                # Check if response has JSON content before trying to parse it
-                content_type = resp.headers.get('Content-Type', '')
-                if 'application/json' in content_type:
-                    return await resp.json()
-                else:
-                    _LOGGER.debug("Non-JSON response received for create_list, returning empty dict")
-                    return {}
+        resp = await self._request("POST", "https://api.listonic.com/api/lists", headers, json=payload)
+        if resp.status not in [200, 201]:
+            raise RuntimeError(f"create_list failed: {resp.status} {resp.text()}")
+        return _json_or_empty(resp, "create_list")
 
     async def delete_list(self, list_id: str):
         """Delete a list in Listonic (set Active: 0)."""
         headers = await self._auth_headers()
         payload = {"Active": 0}
         
-        async with aiohttp.ClientSession() as session:
-            async with session.patch(
-                f"https://api.listonic.com/api/lists/{list_id}",
-                headers=headers,
-                json=payload,
-            ) as resp:
-                if resp.status != 200:
-                    text = await resp.text()
-                    raise RuntimeError(f"delete_list failed: {resp.status} {text}")
-                
-                # Check if response has JSON content before trying to parse it
-                content_type = resp.headers.get('Content-Type', '')
-                if 'application/json' in content_type:
-                    return await resp.json()
-                else:
-                    _LOGGER.debug("Non-JSON response received for delete_list, returning empty dict")
-                    return {}
+        resp = await self._request("PATCH", f"https://api.listonic.com/api/lists/{list_id}", headers, json=payload)
+        if resp.status != 200:
+            raise RuntimeError(f"delete_list failed: {resp.status} {resp.text()}")
+        return _json_or_empty(resp, "delete_list")
 
     async def update_list(self, list_id: str, name: str):
         """Update a list's name in Listonic."""
         headers = await self._auth_headers()
         payload = {"Name": name}
         
-        async with aiohttp.ClientSession() as session:
-            async with session.patch(
-                f"https://api.listonic.com/api/lists/{list_id}",
-                headers=headers,
-                json=payload,
-            ) as resp:
-                if resp.status != 200:
-                    text = await resp.text()
-                    raise RuntimeError(f"update_list failed: {resp.status} {text}")
-                
-                # Check if response has JSON content before trying to parse it
-                content_type = resp.headers.get('Content-Type', '')
-                if 'application/json' in content_type:
-                    return await resp.json()
-                else:
-                    _LOGGER.debug("Non-JSON response received for update_list, returning empty dict")
-                    return {}
+        resp = await self._request("PATCH", f"https://api.listonic.com/api/lists/{list_id}", headers, json=payload)
+        if resp.status != 200:
+            raise RuntimeError(f"update_list failed: {resp.status} {resp.text()}")
+        return _json_or_empty(resp, "update_list")
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import issue_registry as ir
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CPU_BUDGET_MS = 50  # synchronous work per poll cycle
+DEFAULT_LAG_BUDGET_MS = 200  # event loop lag
+
+LAG_PROBE_INTERVAL = 5  # seconds between loop lag samples
+BREACHES_TO_DEGRADE = 3  # consecutive over-budget samples or cycles
+HEALTHY_TO_RECOVER = 60  # consecutive good lag samples, i.e. five minutes
+MAX_UPDATE_INTERVAL = timedelta(seconds=60)
+
+# True in the task that is fetching a poll cycle
+_in_cycle: ContextVar[bool] = ContextVar("listonic_profiler_cycle", default=False)
+
+
+class _Timing:
+    __slots__ = ("calls", "cpu", "wall", "max_cpu", "max_wall")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cpu = 0.0
+        self.wall = 0.0
+        self.max_cpu = 0.0
+        self.max_wall = 0.0
+
+    def add(self, cpu: float, wall: float) -> None:
+        self.calls += 1
+        self.cpu += cpu
+        self.wall += wall
+        self.max_cpu = max(self.max_cpu, cpu)
+        self.max_wall = max(self.max_wall, wall)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "cpu_ms": round(self.cpu * 1000, 2),
+            "wall_ms": round(self.wall * 1000, 2),
+            "max_cpu_ms": round(self.max_cpu * 1000, 2),
+            "max_wall_ms": round(self.max_wall * 1000, 2),
+        }
+
+
+class ListonicProfiler:
+    """Measure how much event loop time the integration uses and back off when it's too much.
+
+    ``measure`` times synchronous sections (thread CPU and wall time) and
+    ``record_wall`` awaited calls. A lag probe samples how late loop timers
+    fire. A poll cycle runs from the start of the refresh until its listeners
+    (entity updates and state writes) have been notified. When a cycle's
+    synchronous CPU or the loop lag stays over budget the profiler switches
+    to degraded mode, widening the poll interval and letting entities and
+    the client skip optional work, and raises a repair issue. It recovers
+    once the loop has been healthy for a while.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        cpu_budget_ms: float = DEFAULT_CPU_BUDGET_MS,
+        lag_budget_ms: float = DEFAULT_LAG_BUDGET_MS,
+    ) -> None:
+        self.hass = hass
+        self.entry_id = entry_id
+        self.cpu_budget = cpu_budget_ms / 1000
+        self.lag_budget = lag_budget_ms / 1000
+        self.timings: dict[str, _Timing] = {}
+        self.degraded = False
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._cycle_cpu = 0.0
+        self._depth = 0  # nested measure() sections count once towards the cycle
+        self._lag_breaches = 0
+        self._cpu_breaches = 0
+        self._healthy = 0
+        self._probe: asyncio.TimerHandle | None = None
+        self._on_degrade: list[Callable[[bool], None]] = []
+
+    @contextmanager
+    def measure(self, name: str, *, cycle: bool = False) -> Iterator[None]:
+        """Time a synchronous section.
+
+        Its CPU counts against the cycle budget when it runs in the polling
+        task or ``cycle`` is set, so service calls made during a poll don't.
+        The section must not await, or the CPU of whatever else runs on the
+        loop meanwhile would be counted too.
+        """
+        counts = cycle or _in_cycle.get()
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            cpu = time.thread_time() - cpu_start
+            self._depth -= 1
+            if counts and not self._depth:
+                self._cycle_cpu += cpu
+            self._timing(name).add(cpu, time.perf_counter() - wall_start)
+
+    def record_wall(self, name: str, wall: float) -> None:
+        """Record an awaited call, which doesn't hold the loop while waiting."""
+        self._timing(name).add(0.0, wall)
+
+    def _timing(self, name: str) -> _Timing:
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = _Timing()
+        return timing
+
+    def start_cycle(self) -> Token:
+        """Start a poll cycle; pass the token to leave_cycle() once fetching is done."""
+        self._cycle_cpu = 0.0
+        return _in_cycle.set(True)
+
+    def leave_cycle(self, token: Token) -> None:
+        """Stop attributing this task's measured sections to the cycle."""
+        _in_cycle.reset(token)
+
+    @callback
+    def end_cycle(self) -> None:
+        """Check the CPU measured since start_cycle() against the budget."""
+        cycle_cpu, self._cycle_cpu = self._cycle_cpu, 0.0
+        if cycle_cpu > self.cpu_budget:
+            self._cpu_breaches += 1
+            self._healthy = 0
+            if self._cpu_breaches >= BREACHES_TO_DEGRADE:
+                self._degrade(f"{cycle_cpu * 1000:.0f} ms of CPU per poll cycle")
+        else:
+            self._cpu_breaches = 0
+
+    def add_degrade_listener(self, listener: Callable[[bool], None]) -> None:
+        """Call listener(degraded) whenever degraded mode is entered or left."""
+        self._on_degrade.append(listener)
+
+    @callback
+    def async_start(self) -> None:
+        """Start sampling event loop lag."""
+        self._schedule_probe()
+
+    @callback
+    def async_stop(self) -> None:
+        if self._probe is not None:
+            self._probe.cancel()
+            self._probe = None
+
+    def _schedule_probe(self) -> None:
+        loop = self.hass.loop
+        expected = loop.time() + LAG_PROBE_INTERVAL
+        self._probe = loop.call_at(expected, self._probe_fired, expected)
+
+    @callback
+    def _probe_fired(self, expected: float) -> None:
+        lag = max(self.hass.loop.time() - expected, 0.0)
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag > self.lag_budget:
+            self._lag_breaches += 1
+            self._healthy = 0
+            if self._lag_breaches >= BREACHES_TO_DEGRADE:
+                self._degrade(f"{lag * 1000:.0f} ms of event loop lag")
+        else:
+            self._lag_breaches = 0
+            if not self._cpu_breaches:
+                self._healthy += 1
+            if self.degraded and self._healthy >= HEALTHY_TO_RECOVER:
+                self._recover()
+        self._schedule_probe()
+
+    def _degrade(self, reason: str) -> None:
+        self._lag_breaches = self._cpu_breaches = 0
+        if self.degraded:
+            return
+        self.degraded = True
+        _LOGGER.warning("Listonic is using too much of the event loop (%s), switching to degraded mode", reason)
+        ir.async_create_issue(
+            self.hass,
+            DOMAIN,
+            f"degraded_{self.entry_id}",
+            is_fixable=False,
+            severity=ir.IssueSeverity.WARNING,
+            translation_key="degraded",
+            translation_placeholders={
+                "reason": reason,
+                "cpu_budget": f"{self.cpu_budget * 1000:.0f}",
+                "lag_budget": f"{self.lag_budget * 1000:.0f}",
+            },
+        )
+        for listener in self._on_degrade:
+            listener(True)
+
+    def _recover(self) -> None:
+        self.degraded = False
+        self._healthy = 0
+        _LOGGER.info("Listonic event loop usage is back within budget, leaving degraded mode")
+        ir.async_delete_issue(self.hass, DOMAIN, f"degraded_{self.entry_id}")
+        for listener in self._on_degrade:
+            listener(False)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "degraded": self.degraded,
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "timings": {name: timing.as_dict() for name, timing in sorted(self.timings.items())},
+        }
+
+
+async def async_run_profile(hass: HomeAssistant, path: str, seconds: float) -> None:
+    """Profile everything running on the event loop for a while and save the stats."""
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError as err:  # another profiler (e.g. the profiler integration) is active
+        raise RuntimeError(f"Cannot start profiling: {err}") from err
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile.disable()
+    await hass.async_add_executor_job(os.makedirs, os.path.dirname(path), 0o755, True)
+    await hass.async_add_executor_job(profile.dump_stats, path)
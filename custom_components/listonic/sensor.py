@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import ListonicCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Cap the attribute size so the recorder doesn't store huge state rows
+MAX_MISSING_ATTRIBUTE = 20
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+):
+    """Set up Listonic sensors from config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    async_add_entities([
+        ListonicMissingItemsSensor(coordinator),
+        ListonicBandwidthSensor(coordinator),
+    ])
+
+
+class ListonicMissingItemsSensor(CoordinatorEntity, SensorEntity):
+    """Number of usually bought items that are due and not on any list."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Usually bought but missing"
+    _attr_icon = "mdi:cart-off"
+
+    def __init__(self, coordinator: ListonicCoordinator) -> None:
+        super().__init__(coordinator)
+        self._attr_unique_id = f"listonic_{coordinator.config_entry.entry_id}_missing_items"
+        self._missing: list[dict[str, Any]] = []
+        self._refresh_missing()
+
+    def _refresh_missing(self) -> None:
+        self._missing = self.coordinator.history.missing(self.coordinator.index)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._refresh_missing()
+        super()._handle_coordinator_update()
+
+    @property
+    def native_value(self) -> int:
+        return len(self._missing)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {"items": [item["name"] for item in self._missing[:MAX_MISSING_ATTRIBUTE]]}
+
+
+class ListonicBandwidthSensor(CoordinatorEntity, SensorEntity):
+    """Bytes transferred from Listonic during the last poll cycle."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Bytes per poll"
+    _attr_icon = "mdi:download-network"
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator: ListonicCoordinator) -> None:
+        super().__init__(coordinator)
+        self._attr_unique_id = f"listonic_{coordinator.config_entry.entry_id}_bytes_per_poll"
+
+    @property
+    def native_value(self) -> int:
+        return self.coordinator.client.bandwidth.last_cycle["wire_bytes"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        bandwidth = self.coordinator.client.bandwidth
+        return {
+            "decoded_bytes": bandwidth.last_cycle["decoded_bytes"],
+            "requests": bandwidth.last_cycle["requests"],
+            "compression_ratio": bandwidth.compression_ratio,
+            "total_bytes": bandwidth.wire_bytes,
+        }
@@ -10,16 +10,16 @@ from homeassistant.components.todo import (
     TodoListEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     CoordinatorEntity,
 )
 
-from datetime import timedelta
-
-from .const import DOMAIN, CONF_DEVICE_ID
+from .const import DOMAIN, CONF_DEVICE_ID, CONF_DEDUP_ON_ADD, CONF_AGGREGATE_TODO, CONF_AGGREGATE_LIST_IDS
+from .item_index import IndexedItem, async_add_item
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,42 +33,21 @@ async def async_setup_entry(
     """Set up Listonic todo platform from config entry."""
     data = hass.data[DOMAIN][entry.entry_id]
     client = data["client"]
-
-    async def _async_update_data():
-        """Fetch latest data from Listonic."""
-        try:
-            lists = await client.get_lists()
-            items_by_list = {}
-            for lst in lists:
-                list_id = lst["Id"]
-                try:
-                    items = await client.get_items(list_id)
-                    items_by_list[list_id] = items
-                except Exception as err:
-                    _LOGGER.error("Error fetching items for list %s: %s", list_id, err)
-                    items_by_list[list_id] = []
-            return {"lists": lists, "items": items_by_list}
-        except Exception as err:
-            _LOGGER.error("Error updating Listonic data: %s", err)
-            # Don't return empty data, raise the exception so coordinator can handle it
-            raise
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name="listonic_todo",
-        update_method=_async_update_data,
-        update_interval=timedelta(seconds=2),  # Increased to 30 seconds for stability
-    )
-
-    await coordinator.async_config_entry_first_refresh()
-
-    # Store the coordinator in hass data
-    hass.data[DOMAIN][entry.entry_id]["coordinator"] = coordinator
+    coordinator = data["coordinator"]
 
     # Create a simple function to update entities
-    async def update_entities_simple():
+    @callback
+    def update_entities_simple():
         """Simple function to update entities based on coordinator data."""
+        # Nothing to add or remove unless a list changed (or we are just starting)
+        if coordinator.profiler.degraded and not coordinator.changed_lists:
+            return
+        # Runs inside the coordinator's listener call, so it counts towards the poll cycle
+        with coordinator.profiler.measure("todo.update_entities"):
+            _update_entities()
+
+    @callback
+    def _update_entities():
         current_entities = hass.data[DOMAIN][entry.entry_id].get("entities", [])
         current_lists = coordinator.data.get("lists", [])
         
@@ -101,8 +80,8 @@ async def async_setup_entry(
                 entity_id = ent_reg.async_get_entity_id("todo", DOMAIN, entity.unique_id)
                 if entity_id:
                     ent_reg.async_remove(entity_id)
-                # Also remove the entity object
-                await entity.async_remove()
+                # Also remove the entity object, outside the measured section
+                hass.async_create_task(entity.async_remove())
             else:
                 entities_to_keep.append(entity)
         
@@ -114,14 +93,15 @@ async def async_setup_entry(
             async_add_entities(new_entities)
 
     # Create initial entities
-    await update_entities_simple()
+    update_entities_simple()
+
+    if entry.options.get(CONF_AGGREGATE_TODO, False):
+        async_add_entities([
+            ListonicAggregateTodoEntity(coordinator, client, entry.options.get(CONF_AGGREGATE_LIST_IDS))
+        ])
     
     # Set up a listener to update entities when data changes
-    def update_entities_callback():
-        """Callback to update entities when coordinator data changes."""
-        hass.async_create_task(update_entities_simple())
-    
-    coordinator.async_add_listener(update_entities_callback)
+    entry.async_on_unload(coordinator.async_add_listener(update_entities_simple))
 
     return True
 
@@ -174,6 +154,75 @@ async def update_entities(hass: HomeAssistant, entry: ConfigEntry, async_add_ent
     if new_entities:
         async_add_entities(new_entities)
 
+def _sort_key(item: dict[str, Any]) -> tuple[bool, int]:
+    sort_order = item.get("SortOrder")
+    return (sort_order is None, sort_order or 0)
+
+
+def _plan_move(order: list[tuple[int, int | None]], item_id: int, previous_id: int | None) -> dict[int, int]:
+    """Return the new SortOrder of every item that has to change for a move.
+
+    ``order`` is the current (id, SortOrder) sequence. The item is placed
+    after ``previous_id``, or first when it is None. Only the moved item
+    changes if there is room between its new neighbours; otherwise the
+    shorter run of neighbours is shifted by one.
+    """
+    rest = [entry for entry in order if entry[0] != item_id]
+    if len(rest) == len(order):
+        raise ValueError(f"Item {item_id} is not on this list")
+    if previous_id is None:
+        pos = 0
+    else:
+        pos = next((i for i, (other_id, _) in enumerate(rest) if other_id == previous_id), None)
+        if pos is None:
+            raise ValueError(f"Item {previous_id} is not on this list")
+        pos += 1
+
+    if any(sort_order is None for _, sort_order in order):
+        # No usable sort orders, number the whole list
+        ids = [other_id for other_id, _ in rest]
+        ids.insert(pos, item_id)
+        current = dict(order)
+        return {other_id: i for i, other_id in enumerate(ids) if current[other_id] != i}
+
+    before = rest[pos - 1][1] if pos > 0 else None
+    after = rest[pos][1] if pos < len(rest) else None
+
+    def _shift_right(value: int) -> dict[int, int]:
+        changes = {item_id: value}
+        for other_id, sort_order in rest[pos:]:
+            if sort_order > value:
+                break
+            value += 1
+            changes[other_id] = value
+        return changes
+
+    def _shift_left(value: int) -> dict[int, int] | None:
+        changes = {item_id: value}
+        for other_id, sort_order in reversed(rest[:pos]):
+            if sort_order < value:
+                break
+            value -= 1
+            changes[other_id] = value
+        return changes if value >= 0 else None
+
+    if before is None and after is None:
+        changes = {}
+    elif before is None:
+        changes = _shift_right(max(after - 1, 0))
+    elif after is None:
+        changes = {item_id: before + 1}
+    elif after - before > 1:
+        changes = {item_id: (before + after) // 2}
+    else:
+        right = _shift_right(before + 1)
+        left = _shift_left(after - 1)
+        changes = left if left is not None and len(left) < len(right) else right
+
+    current = dict(order)
+    return {other_id: value for other_id, value in changes.items() if current[other_id] != value}
+
+
 class ListonicTodoEntity(CoordinatorEntity, TodoListEntity):
     """A Listonic shopping list as a Home Assistant todo list."""
 
@@ -182,6 +231,7 @@ class ListonicTodoEntity(CoordinatorEntity, TodoListEntity):
         TodoListEntityFeature.CREATE_TODO_ITEM
         | TodoListEntityFeature.UPDATE_TODO_ITEM
         | TodoListEntityFeature.DELETE_TODO_ITEM
+        | TodoListEntityFeature.MOVE_TODO_ITEM
     )
 
     def __init__(self, coordinator: DataUpdateCoordinator, client, list_data: dict[str, Any]):
@@ -193,6 +243,7 @@ class ListonicTodoEntity(CoordinatorEntity, TodoListEntity):
         self._attr_unique_id = f"listonic_{self._list_id}"
         # Don't set the name here, we'll use a property to get it dynamically
         self._initial_name = list_data.get("Name", "Listonic List")
+        self._was_available = coordinator.last_update_success
 
     @property
     def name(self) -> str:
@@ -204,13 +255,25 @@ class ListonicTodoEntity(CoordinatorEntity, TodoListEntity):
                 return lst.get("Name", self._initial_name)
         return self._initial_name  # Fallback if list not found
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # While degraded, only lists that changed in this poll write a new state,
+        # unless the coordinator became unavailable or recovered
+        available = self.coordinator.last_update_success
+        if (
+            self.coordinator.profiler.degraded
+            and self._list_id not in self.coordinator.changed_lists
+            and available == self._was_available
+        ):
+            return
+        self._was_available = available
+        super()._handle_coordinator_update()
+
     @property
     def todo_items(self) -> list[TodoItem]:
         """Return the current items for this todo list."""
-        # Use coordinator.data instead of self.coordinator.data
-        items_data = self.coordinator.data.get("items", {}).get(self._list_id, [])
         todo_items: list[TodoItem] = []
-        for item in items_data:
+        for item in self._sorted_items():
             todo_items.append(
                 TodoItem(
                     uid=str(item["Id"]),
@@ -220,10 +283,38 @@ class ListonicTodoEntity(CoordinatorEntity, TodoListEntity):
             )
         return todo_items
 
+    def _sorted_items(self) -> list[dict[str, Any]]:
+        """Items of this list in SortOrder, keeping API order for ties."""
+        items_data = self.coordinator.data.get("items", {}).get(self._list_id, [])
+        return sorted(items_data, key=_sort_key)
+
+    async def async_move_todo_item(self, uid: str, previous_uid: str | None = None) -> None:
+        """Move an item after previous_uid, changing as few sort orders as possible."""
+        items = self._sorted_items()
+        try:
+            changes = _plan_move(
+                [(item["Id"], item.get("SortOrder")) for item in items],
+                int(uid),
+                int(previous_uid) if previous_uid else None,
+            )
+        except ValueError as err:
+            raise HomeAssistantError(str(err)) from err
+        if not changes:
+            return
+
+        await self.client.update_items_sort_order(self._list_id, changes)
+
+        # Show the new order right away instead of waiting for the next poll
+        for item in items:
+            if item["Id"] in changes:
+                item["SortOrder"] = changes[item["Id"]]
+        self.async_write_ha_state()
+
     async def async_create_todo_item(self, item: TodoItem) -> None:
         """Add a new item to the list."""
         try:
-            await self.client.add_item(self._list_id, item.summary)
+            dedup = self.coordinator.config_entry.options.get(CONF_DEDUP_ON_ADD, False)
+            await async_add_item(self.client, self.coordinator.index, self._list_id, item.summary, dedup)
             # Refresh coordinator to get latest data
             await self.coordinator.async_request_refresh()
         except Exception as err:
@@ -271,3 +362,124 @@ class ListonicTodoEntity(CoordinatorEntity, TodoListEntity):
         except Exception as err:
             _LOGGER.error("Error deleting todo items: %s", err)
             raise
+
+
+class ListonicAggregateTodoEntity(CoordinatorEntity, TodoListEntity):
+    """The open items of several Listonic lists as one todo list.
+
+    The item set is kept up to date from the per-poll item changes found by
+    the name index, so a poll only touches the items that changed. Edits are
+    sent to the list that owns the item.
+    """
+
+    _attr_has_entity_name = True
+    _attr_name = "All open items"
+    _attr_icon = "mdi:cart-variant"
+    _attr_supported_features = (
+        TodoListEntityFeature.CREATE_TODO_ITEM
+        | TodoListEntityFeature.UPDATE_TODO_ITEM
+        | TodoListEntityFeature.DELETE_TODO_ITEM
+    )
+
+    def __init__(self, coordinator: DataUpdateCoordinator, client, list_ids: list[str] | None = None):
+        super().__init__(coordinator)
+        self.client = client
+        self._list_ids = {str(list_id) for list_id in list_ids} if list_ids else None
+        self._attr_unique_id = f"listonic_{coordinator.config_entry.entry_id}_all_open"
+        self._open: dict[str, TodoItem] = {}
+        self._items_cache: list[TodoItem] | None = None
+        self._was_available = coordinator.last_update_success
+        for indexed in coordinator.index.items():
+            if not indexed.checked and self._includes(indexed.list_id):
+                self._open[self._uid(indexed)] = self._to_todo_item(indexed)
+
+    def _includes(self, list_id: Any) -> bool:
+        return self._list_ids is None or str(list_id) in self._list_ids
+
+    @staticmethod
+    def _uid(indexed: IndexedItem) -> str:
+        return f"{indexed.list_id}:{indexed.item_id}"
+
+    def _to_todo_item(self, indexed: IndexedItem) -> TodoItem:
+        return TodoItem(
+            uid=self._uid(indexed),
+            summary=indexed.name or "Unnamed",
+            status=TodoItemStatus.NEEDS_ACTION,
+            description=self.coordinator.index.list_name(indexed.list_id),
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        changed = False
+        for change in self.coordinator.last_changes:
+            indexed = change.item
+            if not self._includes(indexed.list_id):
+                continue
+            uid = self._uid(indexed)
+            if change.kind in ("removed", "checked"):
+                changed |= self._open.pop(uid, None) is not None
+            elif not indexed.checked:  # added, unchecked or renamed while open
+                self._open[uid] = self._to_todo_item(indexed)
+                changed = True
+
+        # A renamed list changes the description of all of its open items
+        for list_id in self.coordinator.changed_lists:
+            if not self._includes(list_id):
+                continue
+            list_name = self.coordinator.index.list_name(list_id)
+            for uid, todo in self._open.items():
+                if uid.startswith(f"{list_id}:") and todo.description != list_name:
+                    todo.description = list_name
+                    changed = True
+
+        if changed:
+            self._items_cache = None
+        # Availability follows the coordinator, so a failed or recovered poll writes state too
+        if changed or self.coordinator.last_update_success != self._was_available:
+            self._was_available = self.coordinator.last_update_success
+            super()._handle_coordinator_update()
+
+    @property
+    def todo_items(self) -> list[TodoItem]:
+        """Return the open items of the included lists."""
+        if self._items_cache is None:
+            self._items_cache = list(self._open.values())
+        return self._items_cache
+
+    @staticmethod
+    def _split_uid(uid: str) -> tuple[str, int]:
+        list_id, item_id = uid.rsplit(":", 1)
+        return list_id, int(item_id)
+
+    def _default_list_id(self) -> Any:
+        for lst in self.coordinator.data.get("lists", []):
+            if self._includes(lst["Id"]):
+                return lst["Id"]
+        raise HomeAssistantError("No Listonic list to add the item to")
+
+    async def async_create_todo_item(self, item: TodoItem) -> None:
+        """Add a new item to the first included list."""
+        dedup = self.coordinator.config_entry.options.get(CONF_DEDUP_ON_ADD, False)
+        await async_add_item(self.client, self.coordinator.index, self._default_list_id(), item.summary, dedup)
+        await self.coordinator.async_request_refresh()
+
+    async def async_update_todo_item(self, item: TodoItem) -> None:
+        """Check/uncheck or rename an item on its own list."""
+        list_id, item_id = self._split_uid(item.uid)
+        await self.client.update_item(
+            list_id,
+            item_id,
+            checked=item.status == TodoItemStatus.COMPLETED if item.status else None,
+            name=item.summary or None,
+        )
+        await self.coordinator.async_request_refresh()
+
+    async def async_delete_todo_items(self, uids: list[str]) -> None:
+        """Delete items, one request per owning list."""
+        by_list: dict[str, list[int]] = {}
+        for uid in uids:
+            list_id, item_id = self._split_uid(uid)
+            by_list.setdefault(list_id, []).append(item_id)
+        for list_id, ids in by_list.items():
+            await self.client.delete_items(list_id, ids)
+        await self.coordinator.async_request_refresh()
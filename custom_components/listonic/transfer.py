@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import logging
+import os
+from typing import Any, TextIO
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError, ServiceValidationError
+
+from .const import DOMAIN
+from .listonic_api import ListonicAuthError
+
+_LOGGER = logging.getLogger(__name__)
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMATS = (FORMAT_CSV, FORMAT_JSONL)
+
+CSV_FIELDS = ["list_id", "list_name", "id", "name", "checked"]
+
+EVENT_IMPORT_PROGRESS = "listonic_import_progress"
+
+IMPORT_BATCH_SIZE = 25
+IMPORT_CONCURRENCY = 4
+
+
+def transfer_path(hass: HomeAssistant, filename: str) -> str:
+    """Resolve a file name inside <config>/listonic, rejecting anything outside it."""
+    base = os.path.realpath(hass.config.path(DOMAIN))
+    path = os.path.realpath(os.path.join(base, filename))
+    if os.path.commonpath([base, path]) != base or path == base:
+        raise ServiceValidationError(f"{filename} must be a file name inside {base}")
+    return path
+
+
+def _format_for(path: str, fmt: str | None) -> str:
+    if fmt is None:
+        fmt = FORMAT_CSV if path.endswith(".csv") else FORMAT_JSONL
+    if fmt not in FORMATS:
+        raise ServiceValidationError(f"Unsupported format {fmt}, use one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def _iter_rows(data: dict[str, Any], list_ids: set[str] | None):
+    items_by_list = data.get("items", {})
+    for lst in data.get("lists", []):
+        list_id = lst["Id"]
+        if list_ids is not None and str(list_id) not in list_ids:
+            continue
+        list_name = lst.get("Name", "")
+        for item in items_by_list.get(list_id, []):
+            yield {
+                "list_id": list_id,
+                "list_name": list_name,
+                "id": item["Id"],
+                "name": item.get("Name", ""),
+                "checked": bool(item.get("Checked")),
+            }
+
+
+def _write_export(path: str, fmt: str, data: dict[str, Any], list_ids: set[str] | None) -> int:
+    """Write rows one at a time; the full document is never built in memory."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8", newline="") as fh:
+        if fmt == FORMAT_CSV:
+            writer = csv.DictWriter(fh, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for row in _iter_rows(data, list_ids):
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in _iter_rows(data, list_ids):
+                fh.write(json.dumps(row, ensure_ascii=False))
+                fh.write("\n")
+                count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+async def async_export_lists(
+    hass: HomeAssistant,
+    data: dict[str, Any],
+    filename: str,
+    fmt: str | None = None,
+    list_ids: list[str] | None = None,
+) -> dict[str, Any]:
+    """Export the coordinator model to a CSV or JSON Lines file."""
+    path = transfer_path(hass, filename)
+    fmt = _format_for(path, fmt)
+    wanted = {str(list_id) for list_id in list_ids} if list_ids else None
+    count = await hass.async_add_executor_job(_write_export, path, fmt, data, wanted)
+    _LOGGER.debug("Exported %s Listonic items to %s", count, path)
+    return {"path": path, "items": count}
+
+
+class _RowReader:
+    """Parse an export file a batch at a time, off the event loop."""
+
+    def __init__(self, path: str, fmt: str) -> None:
+        self._path = path
+        self._fmt = fmt
+        self._fh: TextIO | None = None
+        self._rows = None
+
+    def open(self) -> None:
+        self._fh = open(self._path, encoding="utf-8", newline="")
+        if self._fmt == FORMAT_CSV:
+            self._rows = csv.DictReader(self._fh)
+        else:
+            self._rows = (json.loads(line) for line in self._fh if line.strip())
+
+    def read_batch(self, size: int) -> list[dict[str, Any]]:
+        batch = []
+        for row in self._rows:
+            batch.append(row)
+            if len(batch) >= size:
+                break
+        return batch
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+
+
+def _parse_checked(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def _load_checkpoint(path: str) -> dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_checkpoint(path: str, checkpoint: dict[str, Any] | None) -> None:
+    if checkpoint is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(checkpoint, fh)
+    os.replace(tmp_path, path)
+
+
+async def async_import_list(
+    hass: HomeAssistant,
+    client,
+    filename: str,
+    list_id: str,
+    *,
+    fmt: str | None = None,
+    source_list: str | None = None,
+    include_checked: bool = True,
+    resume: bool = True,
+) -> dict[str, Any]:
+    """Import items from an export file into a list.
+
+    Rows are read in batches and each batch is sent with bounded concurrency.
+    Progress is checkpointed next to the file, so after a failure the same
+    call continues where it stopped instead of adding everything again. A
+    checked row whose item was added but not checked off yet is remembered
+    with the new item's Id, so resuming only checks it off. The import stops
+    at the first authentication failure.
+    """
+    path = transfer_path(hass, filename)
+    fmt = _format_for(path, fmt)
+    if not await hass.async_add_executor_job(os.path.isfile, path):
+        raise ServiceValidationError(f"{path} does not exist")
+
+    checkpoint_path = f"{path}.progress"
+    # Rows skipped by the filters are recorded as done, so a checkpoint is only
+    # valid for the same target list and filters
+    identity = {"list_id": str(list_id), "source_list": source_list, "include_checked": include_checked}
+    checkpoint = {}
+    if resume:
+        checkpoint = await hass.async_add_executor_job(_load_checkpoint, checkpoint_path)
+        if any(checkpoint.get(key) != value for key, value in identity.items()):
+            checkpoint = {}
+    done_upto = checkpoint.get("done", 0)  # every row before this one was imported
+    done_extra = set(checkpoint.get("extra", []))  # rows after it that were imported too
+    # Rows whose item was added but still has to be checked off, with the item Id
+    added = {int(number): item_id for number, item_id in checkpoint.get("added", {}).items()}
+    auth_error: Exception | None = None
+
+    semaphore = asyncio.Semaphore(IMPORT_CONCURRENCY)
+
+    async def _import_row(number: int, row: dict[str, Any]) -> None:
+        nonlocal auth_error
+        async with semaphore:
+            if auth_error is not None:
+                raise auth_error  # don't send the rows still waiting in this batch
+            check = include_checked and _parse_checked(row.get("checked"))
+            try:
+                item_id = added.get(number)
+                if item_id is None:
+                    result = await client.add_item(list_id, row["name"])
+                    item_id = result.get("Id") if isinstance(result, dict) else None
+                    if not check or item_id is None:
+                        return
+                    added[number] = int(item_id)
+                await client.update_item(list_id, int(item_id), checked=True)
+                del added[number]
+            except (ListonicAuthError, ConfigEntryNotReady) as err:
+                auth_error = auth_error or err
+                raise
+
+    reader = _RowReader(path, fmt)
+    await hass.async_add_executor_job(reader.open)
+    row_number = 0
+    imported = skipped = 0
+    failed: list[int] = []
+    try:
+        while True:
+            batch = await hass.async_add_executor_job(reader.read_batch, IMPORT_BATCH_SIZE)
+            if not batch:
+                break
+
+            pending: list[tuple[int, dict[str, Any]]] = []
+            for row in batch:
+                number = row_number
+                row_number += 1
+                if number < done_upto or number in done_extra:
+                    continue
+                if source_list and source_list not in (str(row.get("list_id")), row.get("list_name")):
+                    skipped += 1
+                    done_extra.add(number)
+                    continue
+                if not row.get("name") or (not include_checked and _parse_checked(row.get("checked"))):
+                    skipped += 1
+                    done_extra.add(number)
+                    continue
+                pending.append((number, row))
+
+            results = await asyncio.gather(
+                *(_import_row(number, row) for number, row in pending), return_exceptions=True
+            )
+            for (number, _), result in zip(pending, results):
+                if isinstance(result, (ListonicAuthError, ConfigEntryNotReady)):
+                    failed.append(number)
+                elif isinstance(result, Exception):
+                    _LOGGER.warning("Importing row %s of %s failed: %s", number, path, result)
+                    failed.append(number)
+                else:
+                    imported += 1
+                    done_extra.add(number)
+
+            # Advance the contiguous prefix so the checkpoint stays small
+            while done_upto in done_extra:
+                done_extra.discard(done_upto)
+                done_upto += 1
+            await hass.async_add_executor_job(
+                _save_checkpoint,
+                checkpoint_path,
+                {
+                    **identity,
+                    "done": done_upto,
+                    "extra": sorted(done_extra),
+                    "added": {str(number): item_id for number, item_id in added.items()},
+                },
+            )
+            hass.bus.async_fire(
+                EVENT_IMPORT_PROGRESS,
+                {"list_id": list_id, "file": path, "rows": row_number, "imported": imported, "failed": len(failed)},
+            )
+            if auth_error is not None:
+                break
+    finally:
+        await hass.async_add_executor_job(reader.close)
+
+    if auth_error is not None:
+        hass.bus.async_fire(
+            EVENT_IMPORT_PROGRESS,
+            {
+                "list_id": list_id,
+                "file": path,
+                "rows": row_number,
+                "imported": imported,
+                "failed": len(failed),
+                "finished": False,
+                "error": str(auth_error),
+            },
+        )
+        raise HomeAssistantError(
+            f"Import of {path} stopped, Listonic authentication failed: {auth_error}. "
+            "Call the service again to resume."
+        ) from auth_error
+
+    if not failed:
+        await hass.async_add_executor_job(_save_checkpoint, checkpoint_path, None)
+    hass.bus.async_fire(
+        EVENT_IMPORT_PROGRESS,
+        {
+            "list_id": list_id,
+            "file": path,
+            "rows": row_number,
+            "imported": imported,
+            "failed": len(failed),
+            "finished": True,
+        },
+    )
+    return {"imported": imported, "skipped": skipped, "failed": failed}
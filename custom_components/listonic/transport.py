@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any
+
+import aiohttp
+from multidict import CIMultiDict
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.util.json import json_loads
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip/deflate are always available
+    brotli = None
+
+_LOGGER = logging.getLogger(__name__)
+
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli else "gzip, deflate"
+
+CASSETTE_VERSION = 1
+REDACTED = "REDACTED"
+
+# Access token used while replaying; the real credentials are never touched
+REPLAY_ACCESS_TOKEN = "replay"
+
+# Never written to a cassette
+SENSITIVE_HEADERS = {"authorization", "clientauthorization", "cookie", "set-cookie"}
+SENSITIVE_KEYS = {"access_token", "refresh_token", "id_token", "token", "email", "useremail"}
+_FORM_SECRET = re.compile(r"((?:^|&)(?:refresh_token|token)=)[^&]*")
+
+# Flush recorded requests to disk every this many records
+RECORD_FLUSH_EVERY = 50
+
+
+def _decode_body(raw: bytes, encoding: str) -> bytes:
+    """Decompress a response body according to its Content-Encoding."""
+    encoding = encoding.strip().lower()
+    if not raw or encoding in ("", "identity"):
+        return raw
+    if encoding == "gzip":
+        return zlib.decompress(raw, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(raw)
+        except zlib.error:
+            return zlib.decompress(raw, -zlib.MAX_WBITS)  # raw deflate without zlib header
+    if encoding == "br" and brotli is not None:
+        return brotli.decompress(raw)
+    raise RuntimeError(f"Unsupported Content-Encoding: {encoding}")
+
+
+@dataclass(slots=True)
+class ListonicResponse:
+    """A fully read, decompressed HTTP response."""
+
+    status: int
+    headers: CIMultiDict
+    body: bytes
+    wire_bytes: int  # size as transferred, before decompression
+
+    def json(self) -> Any:
+        return json_loads(self.body)
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+class HttpTransport:
+    """Send requests to Listonic over HTTP, negotiating compression."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._session: aiohttp.ClientSession | None = None
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str],
+        json: Any = None,
+        data: Any = None,
+        timeout: aiohttp.ClientTimeout | None = None,
+    ) -> ListonicResponse:
+        if self._session is None:
+            # Bodies are decompressed here rather than by aiohttp so the wire size can be measured
+            self._session = async_create_clientsession(self.hass, auto_decompress=False)
+        headers = {**headers, "Accept-Encoding": ACCEPT_ENCODING}
+        async with self._session.request(
+            method, url, headers=headers, json=json, data=data, timeout=timeout
+        ) as resp:
+            raw = await resp.read()
+            body = _decode_body(raw, resp.headers.get("Content-Encoding", ""))
+            return ListonicResponse(resp.status, CIMultiDict(resp.headers), body, len(raw))
+
+    async def async_close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def _redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key.lower() in SENSITIVE_KEYS else _redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+def _sanitize_headers(headers) -> dict[str, str]:
+    return {key: value for key, value in headers.items() if key.lower() not in SENSITIVE_HEADERS}
+
+
+def _sanitize_body(body: Any) -> Any:
+    if body is None:
+        return None
+    if isinstance(body, str):
+        return _FORM_SECRET.sub(rf"\1{REDACTED}", body)
+    return _redact(body)
+
+
+def _sanitize_response_body(response: ListonicResponse) -> Any:
+    try:
+        return {"json": _redact(response.json())}
+    except ValueError:
+        return {"text": response.text()}
+
+
+class RecordingTransport:
+    """Wrap a transport and write sanitised traffic with timings to a cassette.
+
+    A cassette is a JSON Lines file: a header line followed by one line per
+    request. Credentials, tokens and e-mail addresses are redacted before
+    anything is written.
+    """
+
+    def __init__(self, hass: HomeAssistant, inner, path: str) -> None:
+        self.hass = hass
+        self.inner = inner
+        self.path = path
+        self.records = 0
+        self._pending: list[str] = []
+        self._started = time.monotonic()
+        self._pending.append(json.dumps({"version": CASSETTE_VERSION, "started": time.time()}))
+        self._truncate = True
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> ListonicResponse:
+        started = time.monotonic()
+        response = await self.inner.request(method, url, **kwargs)
+        body = kwargs.get("json")
+        if body is None:
+            body = kwargs.get("data")
+        duration = time.monotonic() - started
+        record = {
+            "offset": round(started - self._started, 4),
+            "duration": round(duration, 4),
+            "method": method,
+            "url": url,
+            "request_headers": _sanitize_headers(kwargs.get("headers") or {}),
+            "request_body": _sanitize_body(body),
+            "status": response.status,
+            "headers": _sanitize_headers(response.headers),
+            "wire_bytes": response.wire_bytes,
+            **_sanitize_response_body(response),
+        }
+        self._pending.append(json.dumps(record, ensure_ascii=False))
+        self.records += 1
+        if len(self._pending) >= RECORD_FLUSH_EVERY:
+            await self.async_flush()
+        return response
+
+    def _write(self, lines: list[str], truncate: bool) -> None:
+        with open(self.path, "w" if truncate else "a", encoding="utf-8") as fh:
+            for line in lines:
+                fh.write(line)
+                fh.write("\n")
+
+    async def async_flush(self) -> None:
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        truncate, self._truncate = self._truncate, False
+        await self.hass.async_add_executor_job(self._write, lines, truncate)
+
+    async def async_close(self) -> None:
+        await self.async_flush()
+        await self.inner.async_close()
+
+
+def load_cassette(path: str) -> list[dict[str, Any]]:
+    """Read the request records of a cassette file."""
+    records = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "method" in record:
+                records.append(record)
+    return records
+
+
+class ReplayTransport:
+    """Serve recorded cassette traffic instead of talking to Listonic.
+
+    Responses are matched by method and URL and returned in recorded order,
+    starting over once a request has used up its recordings, so a short
+    cassette can drive any number of poll cycles. ``speed`` scales the
+    recorded latency: 1.0 is real time, 2.0 twice as fast and 0 no delay.
+    """
+
+    def __init__(self, records: list[dict[str, Any]], speed: float = 1.0) -> None:
+        self.speed = speed
+        self._responses: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        self._positions: dict[tuple[str, str], int] = {}
+        for record in records:
+            self._responses.setdefault((record["method"], record["url"]), []).append(record)
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> ListonicResponse:
+        key = (method, url)
+        recorded = self._responses.get(key)
+        if not recorded:
+            raise RuntimeError(f"No recorded response for {method} {url}")
+        position = self._positions.get(key, 0)
+        self._positions[key] = (position + 1) % len(recorded)
+        record = recorded[position]
+
+        if self.speed > 0:
+            await asyncio.sleep(record.get("duration", 0) / self.speed)
+        if "json" in record:
+            body = json.dumps(record["json"]).encode()
+        else:
+            body = record.get("text", "").encode()
+        return ListonicResponse(
+            record["status"], CIMultiDict(record.get("headers", {})), body, record.get("wire_bytes", len(body))
+        )
+
+    async def async_close(self) -> None:
+        return None